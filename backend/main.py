@@ -1,16 +1,65 @@
-from fastapi import FastAPI
+import time
+
+# Taken before the framework and service imports below; reported by /ready
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.routing import Mount
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
 import os
+import uuid
+import asyncio
+
+from backend.services import providers, image_processing, ibm_service, metrics, logs, static_assets, rate_limit, warmup, shared_state, prefetch
+from backend.services.diffusion_service import LOGO_POSTPROCESS
+from backend.services.logo_jobs import logo_queue
 
 from backend.routes.brand_name import router as brand_name_router
 from backend.routes.logo import router as logo_router
 from backend.routes.content import router as content_router
 from backend.routes.sentiment import router as sentiment_router
 from backend.routes.assistant import router as assistant_router
+from backend.routes.images import router as images_router
+from backend.routes.batch import router as batch_router
+from backend.routes.prefetch import router as prefetch_router
+from backend.routes.frontend import router as frontend_router
+
+log = logs.get_logger("http")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await providers.startup()
+    shared_state.backend()  # fail fast on a bad STATE_BACKEND / unreachable SQLite path
+    await logo_queue.start()
 
-app = FastAPI(title="BrandCraft API", version="1.0.0")
+    # Anything slow happens here, in the background; /ready reports when it is done
+    steps = {"static_assets": lambda: asyncio.to_thread(static_assets.build)}
+    if ibm_service.is_configured():
+        steps["watson"] = ibm_service.warm_up
+    if LOGO_POSTPROCESS:
+        steps["image_workers"] = image_processing.warm_up
+    background = [
+        asyncio.create_task(warmup.run(steps)),
+        asyncio.create_task(ibm_service.keepalive()),
+    ]
+    warmup.mark_lifespan(started)
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await prefetch.shutdown()
+    await logo_queue.stop()
+    await providers.shutdown()
+    await shared_state.close()
+    image_processing.shutdown()
+
+
+app = FastAPI(title="BrandCraft API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,23 +67,111 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+
+def _rate_limited(exc: rate_limit.RateLimited) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Too many requests, retry later", "scope": exc.scope, "retry_after": round(exc.retry_after, 1)},
+        status_code=429, headers=exc.headers,
+    )
+
+
+@app.exception_handler(rate_limit.RateLimited)
+async def rate_limited_handler(request: Request, exc: rate_limit.RateLimited):
+    """Upstream calls shed mid-request (provider bucket empty) surface as 429 too."""
+    return _rate_limited(exc)
+
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Shed over-capacity requests before they reach a route; tag the rest with a priority."""
+    try:
+        level = rate_limit.admit(rate_limit.client_id(request), request.method, request.url.path)
+    except rate_limit.RateLimited as e:
+        return _rate_limited(e)
+    token = rate_limit.priority.set(level)
+    try:
+        return await call_next(request)
+    finally:
+        rate_limit.priority.reset(token)
+
+
+def _route_label(request: Request) -> str:
+    """Route template (e.g. /api/logo/jobs/{job_id}) or mount ("/static/{path}"), never the
+    raw path, so ids and probe URLs can't grow metric cardinality. Anything else is "unmatched"."""
+    route = request.scope.get("route")
+    if route is not None:
+        # Templates of included routes lack the router prefix; recover it from the real path
+        try:
+            rendered = route.url_path_for(route.name, **request.path_params)
+        except Exception:
+            return "unmatched"
+        path = request.url.path
+        return path[:len(path) - len(rendered)] + route.path if path.endswith(rendered) else route.path
+    endpoint = request.scope.get("endpoint")
+    for mount in app.routes:
+        if isinstance(mount, Mount) and mount.app is endpoint:
+            return mount.path + "/{path}"
+    return "unmatched"
+
+
+# Registered last so it wraps admission_control: shed requests are logged and measured too
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Request id + per-route latency histogram + one structured access log line.
+
+    For streaming responses the latency covers time to first byte.
+    """
+    rid = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+    token = logs.request_id.set(rid)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = rid
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        path = _route_label(request)
+        metrics.HTTP_LATENCY.observe(elapsed, route=path, method=request.method, status=str(status))
+        log.info("request", extra={
+            "method": request.method, "route": path, "status": status,
+            "duration_ms": round(elapsed * 1000, 1),
+        })
+        logs.request_id.reset(token)
+
+
 # API Routes
 app.include_router(brand_name_router, prefix="/api")
 app.include_router(logo_router, prefix="/api")
 app.include_router(content_router, prefix="/api")
 app.include_router(sentiment_router, prefix="/api")
 app.include_router(assistant_router, prefix="/api")
+app.include_router(images_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
+app.include_router(prefetch_router, prefix="/api")
 
-# Serve frontend
+# Serve frontend: "/" and the fingerprinted bundles come from the startup build
+app.include_router(frontend_router)
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend")
 app.mount("/static", StaticFiles(directory=frontend_path), name="static")
 
-@app.get("/")
-def serve_frontend():
-    return FileResponse(os.path.join(frontend_path, "index.html"))
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/health")
 def health():
+    """Liveness: the process is up. Cheap enough to use as an event-loop lag probe."""
     return {"status": "ok", "message": "BrandCraft API is running"}
+
+@app.get("/ready")
+def ready():
+    """Readiness: 503 until background warm-up has finished; includes startup timings."""
+    return JSONResponse(warmup.report(), status_code=200 if warmup.is_ready() else 503)
+
+
+warmup.mark_imports(_import_started)
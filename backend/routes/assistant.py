@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from backend.services.gemini_service import branding_assistant_chat
+from typing import List, Optional
+from backend.services.gemini_service import branding_assistant_chat, branding_assistant_stream
+from backend.services import sessions, sse
+from backend.services.rate_limit import RateLimited
+from backend.services.logs import get_logger
 
 router = APIRouter()
+log = get_logger("assistant")
 
 
 class Message(BaseModel):
@@ -12,17 +17,56 @@ class Message(BaseModel):
 
 
 class AssistantRequest(BaseModel):
+    # Send session_id to continue a server-side conversation; messages only seeds a new session
+    session_id: Optional[str] = None
     messages: List[Message] = []
     message: str
 
 
+async def _load_session(request: AssistantRequest) -> dict:
+    seed = [{"role": m.role, "content": m.content} for m in request.messages[-10:]]
+    return await sessions.get_or_create(request.session_id, seed)
+
+
 @router.post("/assistant")
 async def chat_with_assistant(request: AssistantRequest):
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
     try:
-        history = [{"role": m.role, "content": m.content} for m in request.messages]
-        response = branding_assistant_chat(history, request.message)
-        return {"response": response}
+        session = await _load_session(request)
+        response = await branding_assistant_chat(session["turns"], request.message, session["summary"])
+        await sessions.record_turn(session, request.message, response)
+        return {"response": response, "session_id": session["id"]}
+    except RateLimited:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Assistant error: {str(e)}")
+
+
+@router.post("/assistant/stream")
+async def stream_assistant(request: AssistantRequest, http_request: Request):
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    session = await _load_session(request)
+
+    async def events():
+        parts = []
+        tokens = branding_assistant_stream(session["turns"], request.message, session["summary"])
+        try:
+            yield sse.event("session", {"session_id": session["id"]})
+            async for delta in tokens:
+                # Stop reading (and paying for) tokens once the client has gone away
+                if await http_request.is_disconnected():
+                    log.info("client disconnected, cancelling stream", extra={"tokens": len(parts)})
+                    return
+                parts.append(delta)
+                yield sse.event("token", {"content": delta})
+            response = "".join(parts).strip()
+            await sessions.record_turn(session, request.message, response)
+            yield sse.event("done", {"response": response, "session_id": session["id"]})
+        except Exception as e:
+            yield sse.event("error", {"detail": f"Assistant error: {str(e)}"})
+        finally:
+            await tokens.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=sse.HEADERS)
@@ -0,0 +1,82 @@
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from backend.routes.brand_name import BrandNameRequest, create_brand_names
+from backend.routes.content import ContentRequest, create_content
+from backend.routes.sentiment import SentimentRequest, get_sentiment, validate_sentiment_request
+from backend.services.batch import run_batch, BATCH_MAX_ITEMS
+from backend.services.sentiment_service import resolve_backend, analyze_local_batch
+
+router = APIRouter()
+
+
+class BrandNameBatchRequest(BaseModel):
+    items: List[BrandNameRequest]
+    concurrency: Optional[int] = None
+
+
+class ContentBatchRequest(BaseModel):
+    items: List[ContentRequest]
+    concurrency: Optional[int] = None
+
+
+class SentimentBatchRequest(BaseModel):
+    items: List[SentimentRequest]
+    concurrency: Optional[int] = None
+
+
+def _check_size(items: list):
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch cannot be empty")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {BATCH_MAX_ITEMS} items")
+
+
+def _ndjson(items: list, handler, concurrency: Optional[int]) -> StreamingResponse:
+    _check_size(items)
+
+    async def lines():
+        async for outcome in run_batch(items, handler, concurrency):
+            yield json.dumps(outcome) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/batch/brand-name")
+async def batch_brand_names(request: BrandNameBatchRequest):
+    return _ndjson(request.items, create_brand_names, request.concurrency)
+
+
+@router.post("/batch/content")
+async def batch_content(request: ContentBatchRequest):
+    return _ndjson(request.items, create_content, request.concurrency)
+
+
+def _local_sentiment_lines(items: list) -> list:
+    """All-local batches are scored in one pass instead of one task per item."""
+    lines, valid = [None] * len(items), []
+    for index, item in enumerate(items):
+        try:
+            validate_sentiment_request(item)
+            valid.append(index)
+        except HTTPException as e:
+            lines[index] = {"index": index, "ok": False, "error": e.detail}
+    results = analyze_local_batch([items[i].text for i in valid])
+    for index, result in zip(valid, results):
+        lines[index] = {"index": index, "ok": True, "result": result}
+    return lines
+
+
+@router.post("/batch/sentiment")
+async def batch_sentiment(request: SentimentBatchRequest):
+    try:
+        backends = {resolve_backend(item.backend) for item in request.items}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if backends == {"local"}:
+        _check_size(request.items)
+        body = "".join(json.dumps(line) + "\n" for line in _local_sentiment_lines(request.items))
+        return StreamingResponse(iter([body]), media_type="application/x-ndjson")
+    return _ndjson(request.items, get_sentiment, request.concurrency)
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.services.gemini_service import generate_brand_names
+from typing import Optional
+from backend.services import prefetch, sse
+from backend.services.gemini_service import generate_brand_names, stream_brand_names
+from backend.services.llm_json import LLMOutputError
+from backend.services.rate_limit import RateLimited
 
 router = APIRouter()
 
@@ -9,6 +14,9 @@ class BrandNameRequest(BaseModel):
     niche: str
     tone: str = "professional"
     audience: str = "general consumers"
+    use_cache: bool = True
+    # Tone the client will send with follow-up /content requests; prefetch keys on it
+    content_tone: Optional[str] = None
 
 
 @router.post("/brand-name")
@@ -16,7 +24,38 @@ async def create_brand_names(request: BrandNameRequest):
     if not request.niche.strip():
         raise HTTPException(status_code=400, detail="Niche cannot be empty")
     try:
-        result = generate_brand_names(request.niche, request.tone, request.audience)
-        return result
+        result, cached = await generate_brand_names(
+            request.niche, request.tone, request.audience, request.use_cache
+        )
+        if not cached:
+            prefetch.schedule(result["names"], request.niche, request.content_tone or request.tone)
+        return {**result, "cached": cached}
+    except RateLimited:
+        raise
+    except LLMOutputError as e:
+        raise HTTPException(status_code=502, detail=f"Model returned unusable output: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
+
+
+@router.post("/brand-name/stream")
+async def stream_names(request: BrandNameRequest, http_request: Request):
+    """SSE: one "name" event per brand name as soon as it is complete, then "done"."""
+    if not request.niche.strip():
+        raise HTTPException(status_code=400, detail="Niche cannot be empty")
+
+    async def events():
+        names = stream_brand_names(request.niche, request.tone, request.audience, request.use_cache)
+        try:
+            async for event, payload in names:
+                if event == "done" and not payload["cached"]:
+                    prefetch.schedule(payload["names"], request.niche, request.content_tone or request.tone)
+                if await http_request.is_disconnected():
+                    return
+                yield sse.event(event, payload)
+        except Exception as e:
+            yield sse.event("error", {"detail": f"Generation failed: {str(e)}"})
+        finally:
+            await names.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=sse.HEADERS)
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Literal
-from backend.services.gemini_service import generate_brand_content
+from backend.services import prefetch
+from backend.services.gemini_service import generate_brand_content, generate_brand_kit
+from backend.services.llm_json import LLMOutputError
+from backend.services.rate_limit import RateLimited
 
 router = APIRouter()
 
@@ -10,7 +13,9 @@ class ContentRequest(BaseModel):
     brand_name: str
     niche: str
     tone: str = "professional"
-    content_type: Literal["tagline", "bio", "ad_copy", "email", "social"] = "tagline"
+    # "kit" returns every content type in one response
+    content_type: Literal["tagline", "bio", "ad_copy", "email", "social", "kit"] = "tagline"
+    use_cache: bool = True
 
 
 @router.post("/content")
@@ -18,12 +23,24 @@ async def create_content(request: ContentRequest):
     if not request.brand_name.strip():
         raise HTTPException(status_code=400, detail="Brand name cannot be empty")
     try:
-        result = generate_brand_content(
+        if request.content_type == "kit":
+            kit = await generate_brand_kit(request.brand_name, request.niche, request.tone, request.use_cache)
+            if not kit["data"]:
+                raise RuntimeError("; ".join(f"{k}: {v}" for k, v in kit["errors"].items()))
+            return {"content_type": "kit", **kit}
+        result, cached = await generate_brand_content(
             request.brand_name,
             request.niche,
             request.content_type,
-            request.tone
+            request.tone,
+            request.use_cache
         )
-        return {"content_type": request.content_type, "data": result}
+        if cached and request.content_type == "tagline":
+            await prefetch.record_hit("tagline", brand_name=request.brand_name, niche=request.niche, tone=request.tone)
+        return {"content_type": request.content_type, "data": result, "cached": cached}
+    except RateLimited:
+        raise
+    except LLMOutputError as e:
+        raise HTTPException(status_code=502, detail=f"Model returned unusable output: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
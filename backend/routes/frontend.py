@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from backend.services import static_assets
+
+router = APIRouter()
+
+
+def _serve(path: str, request: Request) -> Response:
+    asset = static_assets.lookup(path)
+    if asset is None and not static_assets.is_built():
+        # Built during warm-up (see /ready); never on the request path
+        raise HTTPException(status_code=503, detail="Starting up", headers={"Retry-After": "1"})
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    headers = {"ETag": asset["etag"], "Cache-Control": asset["cache_control"], "Vary": "Accept-Encoding"}
+    if asset["etag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    encoding = static_assets.negotiate(asset, request.headers.get("accept-encoding", ""))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(asset["body"][encoding], media_type=asset["media_type"], headers=headers)
+
+
+@router.get("/", include_in_schema=False)
+def serve_frontend(request: Request):
+    return _serve("/", request)
+
+
+# Fingerprinted build output; anything else under /static falls through to the StaticFiles mount
+@router.get("/static/app.{fingerprint}.{ext}", include_in_schema=False)
+def serve_asset(fingerprint: str, ext: str, request: Request):
+    return _serve(f"/static/app.{fingerprint}.{ext}", request)
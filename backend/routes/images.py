@@ -0,0 +1,52 @@
+import os
+import re
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from backend.services import image_store
+
+router = APIRouter()
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _read(path: str, start: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+
+@router.get("/images/{image_hash}")
+async def get_image(image_hash: str, request: Request):
+    try:
+        path = image_store.path_for(image_hash)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{image_hash}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    # File I/O runs in a thread so a slow disk doesn't stall the event loop
+    media_type = image_store.sniff_content_type(await asyncio.to_thread(_read, path, 0, 16))
+    size = os.path.getsize(path)
+
+    # Single byte-range requests (resumable downloads / partial previews)
+    match = RANGE_RE.match(request.headers.get("range", "").strip())
+    if match and (match.group(1) or match.group(2)):
+        start, end = match.group(1), match.group(2)
+        if start:
+            start, end = int(start), min(int(end) if end else size - 1, size - 1)
+        else:
+            start, end = max(size - int(end), 0), size - 1
+        if start > end or start >= size:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        chunk = await asyncio.to_thread(_read, path, start, end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(chunk, status_code=206, media_type=media_type, headers=headers)
+
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.services.diffusion_service import generate_logo
+from backend.services import prefetch, sse
+from backend.services.diffusion_service import generate_logo, generate_logo_preview, model_health
+from backend.services.logo_jobs import logo_queue, public_view, TERMINAL_STATUSES
+from backend.services.rate_limit import RateLimited
 
 router = APIRouter()
 
@@ -10,6 +15,10 @@ class LogoRequest(BaseModel):
     style: str = "modern"
     primary_color: str = "blue"
     industry: str = "technology"
+    include_base64: bool = False
+    remove_background: bool = False
+    # Fast low-resolution render, cached (and possibly prefetched after /brand-name)
+    preview: bool = False
 
 
 @router.post("/logo")
@@ -17,13 +26,69 @@ async def create_logo(request: LogoRequest):
     if not request.brand_name.strip():
         raise HTTPException(status_code=400, detail="Brand name cannot be empty")
     try:
-        result = generate_logo(
+        if request.preview:
+            params = {"brand_name": request.brand_name, "style": request.style,
+                      "primary_color": request.primary_color, "industry": request.industry}
+            result, cached = await generate_logo_preview(**params)
+            if cached:
+                await prefetch.record_hit("logo_preview", **params)
+            return {**result, "cached": cached}
+        result = await generate_logo(
             request.brand_name,
             request.style,
             request.primary_color,
-            request.industry
+            request.industry,
+            request.include_base64,
+            request.remove_background
         )
         # Always return result — let frontend show the error message
         return result
+    except RateLimited:
+        raise
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/logo/models")
+async def get_logo_models():
+    return model_health()
+
+
+@router.post("/logo/jobs", status_code=202)
+async def submit_logo_job(request: LogoRequest):
+    if not request.brand_name.strip():
+        raise HTTPException(status_code=400, detail="Brand name cannot be empty")
+    try:
+        job = await logo_queue.submit(request.model_dump())
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Logo queue is full, try again shortly")
+    return public_view(job)
+
+
+@router.get("/logo/jobs/{job_id}")
+async def get_logo_job(job_id: str):
+    job = await logo_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_view(job)
+
+
+@router.get("/logo/jobs/{job_id}/events")
+async def stream_logo_job(job_id: str, request: Request):
+    if await logo_queue.store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last_status = None
+        while not await request.is_disconnected():
+            job = await logo_queue.store.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield sse.event("status", public_view(job))
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=sse.HEADERS)
@@ -0,0 +1,36 @@
+import hmac
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from backend.services import prefetch
+from backend.services.settings import settings
+
+router = APIRouter()
+
+
+class PrefetchSwitch(BaseModel):
+    enabled: bool
+
+
+def _require_admin(token: Optional[str]):
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Set ADMIN_TOKEN to enable operator endpoints")
+    if not token or not hmac.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.get("/prefetch")
+async def get_prefetch():
+    """Speculative prefetch state and this worker's usage counters."""
+    return {"configured": prefetch.PREFETCH_ENABLED, "enabled": await prefetch.is_enabled(), **prefetch.usage()}
+
+
+@router.post("/prefetch")
+async def switch_prefetch(request: PrefetchSwitch, x_admin_token: Optional[str] = Header(None)):
+    """Kill switch: {"enabled": false} stops speculative work on every worker (needs X-Admin-Token).
+
+    Re-enabling only takes effect where PREFETCH_ENABLED is set.
+    """
+    _require_admin(x_admin_token)
+    await prefetch.set_enabled(request.enabled)
+    return {"configured": prefetch.PREFETCH_ENABLED, "enabled": await prefetch.is_enabled()}
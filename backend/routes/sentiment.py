@@ -1,22 +1,36 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from backend.services.ibm_service import analyze_sentiment
+from typing import Literal, Optional
+from backend.services.ibm_service import watson_status
+from backend.services.sentiment_service import analyze, cache_status
 
 router = APIRouter()
 
 
 class SentimentRequest(BaseModel):
     text: str
+    # Defaults to SENTIMENT_BACKEND; "watson" asks for IBM NLU explicitly
+    backend: Optional[Literal["local", "watson"]] = None
+    use_cache: bool = True
 
 
-@router.post("/sentiment")
-async def get_sentiment(request: SentimentRequest):
+def validate_sentiment_request(request: SentimentRequest):
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     if len(request.text) < 10:
         raise HTTPException(status_code=400, detail="Text must be at least 10 characters")
+
+
+@router.post("/sentiment")
+async def get_sentiment(request: SentimentRequest):
+    validate_sentiment_request(request)
     try:
-        result = analyze_sentiment(request.text)
+        result = await analyze(request.text, request.backend, request.use_cache)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sentiment analysis failed: {str(e)}")
+
+
+@router.get("/sentiment/health")
+async def sentiment_health():
+    return {"watson": watson_status(), "cache": cache_status()}
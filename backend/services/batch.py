@@ -0,0 +1,63 @@
+import time
+import asyncio
+
+from backend.services.cache import make_key
+from backend.services.settings import settings
+
+BATCH_MAX_ITEMS = settings.batch_max_items
+BATCH_CONCURRENCY = settings.batch_concurrency
+# Max upstream starts per second for one batch (0 = unlimited)
+BATCH_RATE_PER_SEC = settings.batch_rate_per_sec
+
+
+class _RateBudget:
+    """Spaces item starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_batch(items: list, handler, concurrency: int = None, rate: float = None):
+    """Run handler over items concurrently, yielding per-item results as they finish.
+
+    Identical items (by content key) share one call. Each yielded dict carries the
+    original index; a failing item yields ok=False without affecting the others.
+    """
+    limit = max(1, min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    semaphore = asyncio.Semaphore(limit)
+    budget = _RateBudget(BATCH_RATE_PER_SEC if rate is None else rate)
+
+    groups: dict = {}
+    for index, item in enumerate(items):
+        groups.setdefault(make_key(item.model_dump()), (item, []))[1].append(index)
+
+    async def run_one(item, indices):
+        async with semaphore:
+            await budget.wait()
+            try:
+                return indices, {"ok": True, "result": await handler(item)}
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                return indices, {"ok": False, "error": detail}
+
+    tasks = [asyncio.create_task(run_one(item, indices)) for item, indices in groups.values()]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            indices, outcome = await finished
+            for index in indices:
+                yield {"index": index, **outcome}
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,106 @@
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+
+from backend.services import metrics, shared_state
+from backend.services.settings import settings
+
+RESPONSE_CACHE_SIZE = settings.response_cache_size
+RESPONSE_CACHE_TTL = settings.response_cache_ttl
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(*parts) -> str:
+    """Content-addressed key: sha256 over the whitespace-normalised parts."""
+    raw = json.dumps(_normalize(parts), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: float = None):
+        self._data[key] = (time.time() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """Per-process LRU in front of the shared state backend (see shared_state.py).
+
+    Use only for values that never change once written (the memory tier is not
+    invalidated across workers); shared=False keeps the cache per-process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, table: str = "response_cache", shared: bool = True):
+        self.name = table
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize, ttl)
+        self.shared = shared
+
+    async def get(self, key: str):
+        value = self.memory.get(key)
+        result = "memory_hit"
+        if value is None and self.shared:
+            value = await shared_state.backend().get(self.name, key)
+            if value is not None:
+                self.memory.set(key, value)
+                result = "shared_hit"
+        metrics.CACHE_REQUESTS.inc(cache=self.name, result=result if value is not None else "miss")
+        return value
+
+    async def set(self, key: str, value):
+        self.memory.set(key, value)
+        if self.shared:
+            await shared_state.backend().set(self.name, key, value, self.ttl)
+
+    async def get_or_compute(self, key: str, compute) -> tuple:
+        """(value, hit); concurrent misses for one key, in any worker, share a single compute()."""
+        value = self.memory.get(key)
+        if value is not None:
+            metrics.CACHE_REQUESTS.inc(cache=self.name, result="memory_hit")
+            return value, True
+        if not self.shared:
+            metrics.CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            value = await compute()
+            self.memory.set(key, value)
+            return value, False
+        value, hit = await shared_state.backend().get_or_compute(self.name, key, compute, self.ttl)
+        self.memory.set(key, value)
+        metrics.CACHE_REQUESTS.inc(cache=self.name, result="shared_hit" if hit else "miss")
+        return value, hit
+
+
+# Parsed LLM responses for brand names and content
+response_cache = TieredCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
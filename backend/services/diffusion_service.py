@@ -1,13 +1,19 @@
-import requests
-import os
-import base64
+import math
 import time
-from dotenv import load_dotenv
+import base64
+import asyncio
+import httpx
+from collections import deque
+
+from backend.services import providers, image_store, image_processing, metrics
+from backend.services.cache import response_cache, make_key
+from backend.services.logs import get_logger
+from backend.services.rate_limit import RateLimited
+from backend.services.settings import settings
 
-load_dotenv(override=True)
+HF_TOKEN = settings.hf_token
 
-_raw_token = os.getenv("HF_TOKEN", "")
-HF_TOKEN = _raw_token.strip().strip("'\"").strip()
+LOGO_POSTPROCESS = settings.logo_postprocess
 
 HEADERS = {
     "Authorization": f"Bearer {HF_TOKEN}",
@@ -15,12 +21,23 @@ HEADERS = {
 }
 
 # Updated to new HuggingFace router URL
+HF_API_BASE = settings.hf_api_base
+
 MODELS = [
     "black-forest-labs/FLUX.1-schnell",
     "stabilityai/stable-diffusion-xl-base-1.0",
     "runwayml/stable-diffusion-v1-5",
 ]
 
+# How MODELS are tried: "sequential" (in order), "hedged" (start the next model once the
+# current one exceeds its p95 latency), or "race" (all at once, first image wins)
+LOGO_DISPATCH = settings.logo_dispatch
+LOGO_HEDGE_DELAY = settings.logo_hedge_delay    # used until a model has enough samples
+LOGO_MODEL_COOLDOWN = settings.logo_model_cooldown
+LOGO_MODEL_MAX_FAILURES = settings.logo_model_max_failures
+# Edge length of preview logos; roughly a quarter of the pixels of a full-size render
+LOGO_PREVIEW_SIZE = settings.logo_preview_size
+
 STYLE_PROMPTS = {
     "minimalist": "minimalist flat vector logo, clean lines, simple geometric shapes",
     "modern": "modern professional logo, bold typography, sleek design",
@@ -31,7 +48,172 @@ STYLE_PROMPTS = {
 }
 
 
-def generate_logo(brand_name: str, style: str, primary_color: str, industry: str) -> dict:
+log = get_logger("logo")
+
+
+class _AuthError(Exception):
+    pass
+
+
+# ── Per-model health ────────────────────────────────────────────
+MODEL_HEALTH = {
+    model: {"latencies": deque(maxlen=50), "failures": 0, "down_until": 0.0}
+    for model in MODELS
+}
+
+
+def _record_success(model: str, elapsed: float):
+    health = MODEL_HEALTH[model]
+    health["latencies"].append(elapsed)
+    health["failures"] = 0
+    health["down_until"] = 0.0
+
+
+def _record_failure(model: str, cold: bool = False):
+    """Cold (503) models are benched immediately; others after repeated failures."""
+    health = MODEL_HEALTH[model]
+    health["failures"] += 1
+    if cold or health["failures"] >= LOGO_MODEL_MAX_FAILURES:
+        health["down_until"] = time.time() + LOGO_MODEL_COOLDOWN
+        log.warning("model benched", extra={"model": model, "cooldown_s": LOGO_MODEL_COOLDOWN})
+
+
+def _hedge_delay(model: str) -> float:
+    latencies = sorted(MODEL_HEALTH[model]["latencies"])
+    if len(latencies) < 5:
+        return LOGO_HEDGE_DELAY
+    return latencies[math.ceil(len(latencies) * 0.95) - 1]  # nearest-rank p95
+
+
+def _available_models() -> list:
+    now = time.time()
+    healthy = [m for m in MODELS if MODEL_HEALTH[m]["down_until"] <= now]
+    # If everything is benched, still try in order rather than failing outright
+    return healthy or list(MODELS)
+
+
+def model_health() -> dict:
+    now = time.time()
+    return {
+        model: {
+            "available": h["down_until"] <= now,
+            "cooldown_remaining": max(0, round(h["down_until"] - now, 1)),
+            "consecutive_failures": h["failures"],
+            "p95_seconds": round(_hedge_delay(model), 2) if len(h["latencies"]) >= 5 else None,
+            "samples": len(h["latencies"]),
+        }
+        for model, h in MODEL_HEALTH.items()
+    }
+
+
+async def _call_model(model: str, prompt: str, parameters: dict = None) -> bytes:
+    """Return image bytes from one model, or raise."""
+    api_url = f"{HF_API_BASE}/{model}"
+    log.info("trying model", extra={"model": model})
+    started = time.perf_counter()
+    payload = {"inputs": prompt}
+    if parameters:
+        payload["parameters"] = parameters
+    try:
+        response = await providers.post(
+            "huggingface",
+            api_url,
+            headers=HEADERS,
+            json=payload,
+            model=model,
+        )
+    except httpx.TimeoutException:
+        log.warning("model timeout", extra={"model": model})
+        metrics.LOGO_ATTEMPTS.inc(model=model, outcome="timeout")
+        _record_failure(model)
+        raise
+    except httpx.TransportError as e:
+        log.warning("model transport error", extra={"model": model, "error": str(e) or type(e).__name__})
+        metrics.LOGO_ATTEMPTS.inc(model=model, outcome="transport_error")
+        _record_failure(model)
+        raise
+
+    if response.status_code == 200:
+        content_type = response.headers.get("content-type", "")
+        if "image" in content_type or len(response.content) > 1000:
+            _record_success(model, time.perf_counter() - started)
+            metrics.LOGO_ATTEMPTS.inc(model=model, outcome="success")
+            return response.content
+        log.warning("non-image response", extra={"model": model, "body": response.text[:200]})
+        metrics.LOGO_ATTEMPTS.inc(model=model, outcome="non_image")
+        _record_failure(model)
+        raise RuntimeError("Non-image response")
+
+    if response.status_code == 401:
+        raise _AuthError()
+
+    if response.status_code == 503:
+        # providers.post already waited and retried; the model is still cold
+        log.warning("model still loading after retries", extra={"model": model})
+        metrics.LOGO_ATTEMPTS.inc(model=model, outcome="cold")
+        _record_failure(model, cold=True)
+        raise RuntimeError("Model loading")
+
+    log.warning("model error", extra={"model": model, "status": response.status_code, "body": response.text[:300]})
+    metrics.LOGO_ATTEMPTS.inc(model=model, outcome=f"http_{response.status_code}")
+    _record_failure(model)
+    raise RuntimeError(f"HTTP {response.status_code}")
+
+
+async def _dispatch(prompt: str, strategy: str, parameters: dict = None) -> tuple:
+    """Run MODELS under the chosen strategy; returns (model, image_bytes) or (None, None)."""
+    queue = _available_models()
+    running: dict = {}
+
+    def launch():
+        model = queue.pop(0)
+        running[asyncio.create_task(_call_model(model, prompt, parameters))] = model
+        return model
+
+    last = launch()
+    if strategy == "race":
+        while queue:
+            launch()
+
+    # A launch shed by the provider limiter never reached a model. Keep waiting on the
+    # calls already running, launch nothing more (the bucket is per provider), and only
+    # surface the shed once nothing else is left to finish.
+    shed = None
+    try:
+        while running:
+            timeout = _hedge_delay(last) if strategy == "hedged" and queue and shed is None else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                log.info("hedging", extra={"model": last, "hedge_delay_s": round(timeout, 2)})
+                last = launch()
+                continue
+            for task in done:
+                model = running.pop(task)
+                try:
+                    return model, task.result()
+                except _AuthError:
+                    raise
+                except RateLimited as e:
+                    log.info("model launch shed", extra={"model": model, "retry_after_s": round(e.retry_after, 2)})
+                    shed = e
+                except Exception as e:
+                    log.info("model attempt failed", extra={"model": model, "error": str(e) or type(e).__name__})
+            if queue and not running and shed is None:
+                last = launch()
+        if shed is not None:
+            raise shed
+        return None, None
+    finally:
+        # Cancel losers so their upstream connections are released
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def generate_logo(brand_name: str, style: str, primary_color: str, industry: str,
+                        include_base64: bool = False, remove_background: bool = False,
+                        preview: bool = False) -> dict:
+    """Generate a logo. preview=True renders at LOGO_PREVIEW_SIZE and skips post-processing."""
     if not HF_TOKEN:
         return {"success": False, "error": "HF_TOKEN is not set in your .env file."}
 
@@ -42,63 +224,55 @@ def generate_logo(brand_name: str, style: str, primary_color: str, industry: str
         f"high quality, vector art style, centered composition"
     )
 
-    for model in MODELS:
-        # New router URL format
-        api_url = f"https://router.huggingface.co/hf-inference/models/{model}"
-        print(f"[Logo] Trying: {api_url}")
+    try:
+        parameters = {"width": LOGO_PREVIEW_SIZE, "height": LOGO_PREVIEW_SIZE} if preview else None
+        model, content = await _dispatch(prompt, LOGO_DISPATCH, parameters)
+    except _AuthError:
+        return {"success": False, "error": "HF_TOKEN is invalid. Get a new one from https://huggingface.co/settings/tokens"}
+
+    if content is None:
+        return {
+            "success": False,
+            "error": "Logo generation failed. Check terminal logs for details."
+        }
 
+    image_hash = await image_store.save(content)
+    log.info("logo generated", extra={"model": model, "image_hash": image_hash})
+    result = {
+        "success": True,
+        "image_url": image_store.url_for(image_hash),
+        "image_hash": image_hash,
+        "prompt_used": prompt,
+        "model": model,
+        "preview": preview,
+    }
+    if LOGO_POSTPROCESS and not preview:
         try:
-            response = requests.post(
-                api_url,
-                headers=HEADERS,
-                json={"inputs": prompt},
-                timeout=90
+            result["variants"] = await image_processing.process_logo(
+                image_hash, content, remove_background
             )
+        except Exception:
+            log.exception("post-processing failed", extra={"image_hash": image_hash})
+    if include_base64:
+        result["image_base64"] = base64.b64encode(content).decode("utf-8")
+    return result
 
-            print(f"[Logo] Status: {response.status_code}")
-
-            if response.status_code == 200:
-                content_type = response.headers.get("content-type", "")
-                if "image" in content_type or len(response.content) > 1000:
-                    image_b64 = base64.b64encode(response.content).decode("utf-8")
-                    print(f"[Logo] Success with {model}")
-                    return {
-                        "success": True,
-                        "image_base64": image_b64,
-                        "prompt_used": prompt,
-                        "model": model
-                    }
-                else:
-                    print(f"[Logo] Non-image response: {response.text[:200]}")
-
-            elif response.status_code == 401:
-                return {"success": False, "error": "HF_TOKEN is invalid. Get a new one from https://huggingface.co/settings/tokens"}
-
-            elif response.status_code == 503:
-                try:
-                    wait = response.json().get("estimated_time", 20)
-                    print(f"[Logo] Model loading, waiting {min(wait,30)}s...")
-                    time.sleep(min(wait, 30))
-                except:
-                    time.sleep(20)
-                # Retry
-                retry = requests.post(api_url, headers=HEADERS, json={"inputs": prompt}, timeout=90)
-                print(f"[Logo] Retry status: {retry.status_code}")
-                if retry.status_code == 200:
-                    image_b64 = base64.b64encode(retry.content).decode("utf-8")
-                    return {"success": True, "image_base64": image_b64, "prompt_used": prompt, "model": model}
-
-            else:
-                print(f"[Logo] Error {response.status_code}: {response.text[:300]}")
-
-        except requests.exceptions.Timeout:
-            print(f"[Logo] Timeout on {model}, trying next...")
-            continue
-        except Exception as e:
-            print(f"[Logo] Exception: {e}")
-            continue
 
-    return {
-        "success": False,
-        "error": "Logo generation failed. Check terminal logs for details."
-    }
\ No newline at end of file
+async def generate_logo_preview(brand_name: str, style: str, primary_color: str, industry: str) -> tuple:
+    """Low-resolution logo through the response cache; returns (result, cached).
+
+    Only successful previews are cached. Concurrent identical requests (including a
+    speculative prefetch still in flight) share one generation.
+    """
+    params = {"brand_name": brand_name, "style": style, "primary_color": primary_color, "industry": industry}
+
+    async def compute():
+        result = await generate_logo(**params, preview=True)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error") or "Logo generation failed")
+        return result
+
+    try:
+        return await response_cache.get_or_compute(make_key("logo_preview", params), compute)
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}, False
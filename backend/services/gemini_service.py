@@ -1,53 +1,141 @@
-import os
 import json
-import requests
-from dotenv import load_dotenv
+import time
+import asyncio
+from pydantic import ValidationError
 
-load_dotenv(override=True)
+from backend.services import providers, metrics
+from backend.services.cache import response_cache, make_key
+from backend.services.llm_json import extract_json, ArrayItemStream, LLMOutputError
+from backend.services.schemas import BrandName, BrandNamesResponse, BrandKitResponse, CONTENT_SCHEMAS
+from backend.services.logs import get_logger
+from backend.services.settings import settings
 
-_raw_key = os.getenv("OPENROUTER_API_KEY", "")
-OPENROUTER_API_KEY = _raw_key.strip().strip("'\"").strip()
+OPENROUTER_API_KEY = settings.openrouter_api_key
 
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_URL = settings.openrouter_url
 
 
 MODEL = "arcee-ai/trinity-large-preview:free"
 
+log = get_logger("gemini")
 
-def _chat(messages: list) -> str:
-    """Call OpenRouter API with a messages array."""
+
+def _headers() -> dict:
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY is not set in your .env file")
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:8000",
+        "X-Title": "BrandCraft"
+    }
+
 
-    response = requests.post(
+async def _chat(messages: list) -> str:
+    """Call OpenRouter API with a messages array."""
+    response = await providers.post(
+        "openrouter",
         OPENROUTER_URL,
-        headers={
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:8000",
-            "X-Title": "BrandCraft"
-        },
+        headers=_headers(),
         json={
             "model": MODEL,
             "messages": messages
         },
-        timeout=60
+        model=MODEL,
     )
     response.raise_for_status()
     return response.json()["choices"][0]["message"]["content"].strip()
 
 
-def _parse_json(text: str) -> dict:
-    """Strip markdown fences and parse JSON."""
-    text = text.strip()
-    if text.startswith("```"):
-        text = text.split("```")[1]
-        if text.startswith("json"):
-            text = text[4:]
-    return json.loads(text.strip())
+async def _chat_stream(messages: list):
+    """Stream an OpenRouter completion, yielding content deltas as they arrive."""
+    async with providers.stream(
+        "openrouter",
+        OPENROUTER_URL,
+        headers=_headers(),
+        json={
+            "model": MODEL,
+            "messages": messages,
+            "stream": True
+        },
+        model=MODEL,
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            response.raise_for_status()
+        async for line in response.aiter_lines():
+            # SSE frames: "data: {...}", ": keep-alive" comments, and a final "data: [DONE]"
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            chunk = json.loads(payload)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"].get("message", "stream error"))
+            choices = chunk.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+def _validate(text: str, schema: type = None) -> dict:
+    """Extract the first JSON object from text and check it against schema (if any)."""
+    with metrics.PARSE_LATENCY.time(operation="parse_json"):
+        data = extract_json(text)
+        if schema is None:
+            return data
+        try:
+            return schema.model_validate(data).model_dump()
+        except ValidationError as e:
+            raise LLMOutputError(f"{schema.__name__}: {e.error_count()} validation error(s): "
+                                 f"{e.errors()[0]['loc']} {e.errors()[0]['msg']}") from e
+
+
+REPAIR_SYSTEM = "You repair malformed JSON. Return only the corrected JSON object: no prose, no markdown fences."
 
 
-def generate_brand_names(niche: str, tone: str, audience: str) -> dict:
+async def _parse_or_repair(text: str, schema: type = None) -> dict:
+    """_validate, with one short repair round-trip instead of failing the whole request."""
+    label = schema.__name__ if schema else "any"
+    try:
+        data = _validate(text, schema)
+        metrics.LLM_JSON_OUTCOMES.inc(schema=label, outcome="ok")
+        return data
+    except LLMOutputError as e:
+        error = str(e)
+
+    log.info("repairing llm json", extra={"schema": label, "error": error, "chars": len(text)})
+    shape = json.dumps(schema.model_json_schema(), separators=(",", ":")) if schema else "any JSON object"
+    repaired = await _chat([
+        {"role": "system", "content": REPAIR_SYSTEM},
+        {"role": "user", "content": f"Problem: {error}\nRequired shape (JSON Schema): {shape}\n\nOutput to repair:\n{text}"}
+    ])
+    try:
+        data = _validate(repaired, schema)
+    except LLMOutputError:
+        metrics.LLM_JSON_OUTCOMES.inc(schema=label, outcome="failed")
+        raise
+    metrics.LLM_JSON_OUTCOMES.inc(schema=label, outcome="repaired")
+    return data
+
+
+async def _chat_json(messages: list, use_cache: bool = True, schema: type = None) -> tuple:
+    """_chat + validated JSON extraction behind the response cache. Returns (data, cache_hit)."""
+    key = make_key(MODEL, messages)
+
+    async def compute():
+        return await _parse_or_repair(await _chat(messages), schema)
+
+    if use_cache:
+        # Identical concurrent requests (in any worker) share one upstream call
+        return await response_cache.get_or_compute(key, compute)
+    data = await compute()
+    await response_cache.set(key, data)
+    return data, False
+
+
+def _brand_name_messages(niche: str, tone: str, audience: str) -> list:
     prompt = f"""You are an expert brand naming consultant.
 Generate 6 unique, memorable brand names for a {niche} business.
 Target audience: {audience}
@@ -66,15 +154,53 @@ Respond ONLY in this exact JSON format (no markdown fences):
   ]
 }}"""
 
-    text = _chat([
+    return [
         {"role": "system", "content": "You are an expert brand naming consultant. Always respond with valid JSON only, no markdown."},
         {"role": "user", "content": prompt}
-    ])
-    return _parse_json(text)
+    ]
+
+
+async def generate_brand_names(niche: str, tone: str, audience: str, use_cache: bool = True) -> tuple:
+    return await _chat_json(_brand_name_messages(niche, tone, audience), use_cache, BrandNamesResponse)
+
+
+async def stream_brand_names(niche: str, tone: str, audience: str, use_cache: bool = True):
+    """Yield ("name", item) as each name finishes streaming, then ("done", {"names", "cached"}).
 
+    The full reply is still validated (and repaired if needed) at the end; any names the
+    incremental parser could not emit are sent then, so clients always get the full list.
+    """
+    messages = _brand_name_messages(niche, tone, audience)
+    key = make_key(MODEL, messages)
+    if use_cache:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            for item in cached["names"]:
+                yield "name", item
+            yield "done", {"names": cached["names"], "cached": True}
+            return
 
-def generate_brand_content(brand_name: str, niche: str, content_type: str, tone: str) -> dict:
-    prompts = {
+    items = ArrayItemStream("names")
+    sent = set()
+    async for delta in _chat_stream(messages):
+        for raw in items.feed(delta):
+            try:
+                item = BrandName.model_validate(raw).model_dump()
+            except ValidationError:
+                continue
+            sent.add(item["name"])
+            yield "name", item
+
+    data = await _parse_or_repair(items.text, BrandNamesResponse)
+    await response_cache.set(key, data)
+    for item in data["names"]:
+        if item["name"] not in sent:
+            yield "name", item
+    yield "done", {"names": data["names"], "cached": False}
+
+
+def _content_prompts(brand_name: str, niche: str, tone: str) -> dict:
+    return {
         "tagline": f"""Create 5 powerful taglines for '{brand_name}', a {niche} brand with a {tone} tone.
 Return JSON only: {{"taglines": [{{"text": "...", "use_case": "..."}}]}}""",
 
@@ -95,15 +221,63 @@ Return JSON only: {{"subject": "...", "preview": "...", "body": "...", "sign_off
 Return JSON only: {{"posts": [{{"platform": "...", "content": "...", "hashtags": ["..."]}}]}}"""
     }
 
-    text = _chat([
-        {"role": "system", "content": "You are a brand content writer. Always respond with valid JSON only, no markdown fences."},
-        {"role": "user", "content": prompts[content_type]}
-    ])
-    return _parse_json(text)
 
+CONTENT_SYSTEM = "You are a brand content writer. Always respond with valid JSON only, no markdown fences."
+
+CONTENT_TYPES = ["tagline", "bio", "ad_copy", "email", "social"]
+
+# "parallel": five concurrent calls (each cacheable on its own); "combined": one structured prompt
+CONTENT_KIT_MODE = settings.content_kit_mode
+
+
+async def generate_brand_content(brand_name: str, niche: str, content_type: str, tone: str, use_cache: bool = True) -> tuple:
+    return await _chat_json([
+        {"role": "system", "content": CONTENT_SYSTEM},
+        {"role": "user", "content": _content_prompts(brand_name, niche, tone)[content_type]}
+    ], use_cache, CONTENT_SCHEMAS[content_type])
+
+
+async def generate_brand_kit(brand_name: str, niche: str, tone: str, use_cache: bool = True, mode: str = None) -> dict:
+    """All content types in one call. Wall-clock is roughly the slowest section, not the sum."""
+    mode = mode or CONTENT_KIT_MODE
+    started = time.perf_counter()
+    data, timings, cached, errors = {}, {}, {}, {}
+
+    if mode == "combined":
+        prompts = _content_prompts(brand_name, niche, tone)
+        sections = "\n\n".join(f"### {t}\n{prompts[t]}" for t in CONTENT_TYPES)
+        prompt = f"""Produce a complete brand content kit. Complete every section below.
+Return ONE JSON object whose keys are exactly {json.dumps(CONTENT_TYPES)}, each holding that section's JSON.
+
+{sections}"""
+        # Validated (and repaired if needed) as a whole before it is cached
+        combined, hit = await _chat_json([
+            {"role": "system", "content": CONTENT_SYSTEM},
+            {"role": "user", "content": prompt}
+        ], use_cache, BrandKitResponse)
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+        for t in CONTENT_TYPES:
+            data[t] = combined[t]
+            timings[t] = elapsed
+            cached[t] = hit
+    else:
+        async def section(content_type: str):
+            t0 = time.perf_counter()
+            try:
+                data[content_type], cached[content_type] = await generate_brand_content(
+                    brand_name, niche, content_type, tone, use_cache
+                )
+            except Exception as e:
+                errors[content_type] = str(e)
+            timings[content_type] = round((time.perf_counter() - t0) * 1000, 1)
+
+        await asyncio.gather(*(section(t) for t in CONTENT_TYPES))
 
-def branding_assistant_chat(messages: list, user_message: str) -> str:
-    system = """You are BrandCraft AI, an expert branding consultant with 20 years of experience.
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return {"mode": mode, "data": data, "timings_ms": timings, "cached": cached, "errors": errors}
+
+
+ASSISTANT_SYSTEM = """You are BrandCraft AI, an expert branding consultant with 20 years of experience.
 You help entrepreneurs and creators build powerful brand identities from scratch.
 You are warm, encouraging, and give actionable, specific advice.
 Ask clarifying questions to understand their vision. Guide them step by step through:
@@ -116,9 +290,41 @@ Ask clarifying questions to understand their vision. Guide them step by step thr
 
 Keep responses concise (under 200 words) but impactful. Use bullet points sparingly."""
 
-    conversation = [{"role": "system", "content": system}]
-    for msg in messages[-10:]:
+
+def _assistant_conversation(messages: list, user_message: str, summary: str = "") -> list:
+    conversation = [{"role": "system", "content": ASSISTANT_SYSTEM}]
+    if summary:
+        conversation.append({"role": "system", "content": f"Summary of the conversation so far:\n{summary}"})
+    for msg in messages:
         conversation.append({"role": msg["role"], "content": msg["content"]})
     conversation.append({"role": "user", "content": user_message})
+    return conversation
+
+
+async def branding_assistant_chat(messages: list, user_message: str, summary: str = "") -> str:
+    return await _chat(_assistant_conversation(messages, user_message, summary))
+
+
+async def branding_assistant_stream(messages: list, user_message: str, summary: str = ""):
+    """Token-by-token variant of branding_assistant_chat."""
+    async for delta in _chat_stream(_assistant_conversation(messages, user_message, summary)):
+        yield delta
 
-    return _chat(conversation)
\ No newline at end of file
+
+async def summarize_conversation(summary: str, turns: list) -> str:
+    """Fold older turns into a running summary used by server-side assistant sessions."""
+    transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+    prompt = f"""Update the running summary of a branding consultation.
+Keep every concrete decision, name, audience detail and preference. Under 150 words.
+
+Current summary:
+{summary or "(none)"}
+
+New conversation turns:
+{transcript}
+
+Return only the updated summary."""
+    return await _chat([
+        {"role": "system", "content": "You summarize conversations faithfully and concisely."},
+        {"role": "user", "content": prompt}
+    ])
@@ -1,93 +1,201 @@
-import os
-from dotenv import load_dotenv
+import time
+import asyncio
+import threading
 
-load_dotenv(override=True)
+from backend.services import providers, local_sentiment, metrics
+from backend.services.logs import get_logger
+from backend.services.rate_limit import RateLimited
+from backend.services.settings import settings
 
-IBM_API_KEY = os.getenv("IBM_API_KEY", "").strip().strip("'\"").strip()
-IBM_URL = os.getenv("IBM_URL", "").strip().strip("'\"").strip()
+IBM_API_KEY = settings.ibm_api_key
+IBM_URL = settings.ibm_url
+# Override only to point at a stand-in IAM server (see benchmarks/)
+IBM_IAM_URL = settings.ibm_iam_url or None
 
+log = get_logger("ibm")
 
-def analyze_sentiment(text: str) -> dict:
+# Circuit breaker: after this many consecutive Watson failures, skip straight to the
+# fallback for IBM_BREAKER_RESET seconds, then let one trial request through
+IBM_BREAKER_THRESHOLD = settings.ibm_breaker_threshold
+IBM_BREAKER_RESET = settings.ibm_breaker_reset
+# Background keepalive: refreshes the IAM token and probes Watson while the breaker is open
+IBM_PROBE_INTERVAL = settings.ibm_probe_interval
+
+
+def _service_url() -> str:
+    # Ensure URL has no trailing slash and has https://
+    url = IBM_URL.rstrip('/')
+    if not url.startswith('http'):
+        url = 'https://' + url
+    return url
+
+
+SERVICE_URL = _service_url() if IBM_URL else ""
+
+
+# ── Long-lived client ──────────────────────────────────────────
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Build the NLU client once (thread-safe). The authenticator caches the IAM token."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from ibm_watson import NaturalLanguageUnderstandingV1
+                from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+
+                authenticator = IAMAuthenticator(IBM_API_KEY, url=IBM_IAM_URL)
+                nlu = NaturalLanguageUnderstandingV1(
+                    version='2022-04-07',
+                    authenticator=authenticator
+                )
+                nlu.set_service_url(SERVICE_URL)
+                _client = nlu
+    return _client
+
+
+def _refresh_token():
+    """Fetch/refresh the IAM token now so request threads never pay the exchange."""
+    _get_client().authenticator.token_manager.get_token()
+
+
+def _probe():
+    """Cheap authenticated round trip used as a health check."""
+    _refresh_token()
+    _get_client().list_models().get_result()
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half-open after reset → closed on success."""
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = ""
+        self.probe_started = 0.0  # half-open: when the current trial request was let through
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state != "half-open":
+            return state == "closed"
+        # One trial at a time; a trial that never reports back frees the slot after reset_after
+        now = time.time()
+        if now - self.probe_started < self.reset_after:
+            return False
+        self.probe_started = now
+        return True
+
+    def release(self):
+        """The trial ended without telling us anything about Watson (bad input, shed)."""
+        self.probe_started = 0.0
+
+    def success(self):
+        self.failures = 0
+        self.last_error = ""
+        self.probe_started = 0.0
+
+    def failure(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        self.probe_started = 0.0
+        if self.failures >= self.threshold:
+            self.opened_at = time.time()
+            log.warning("circuit open", extra={"reset_after_s": self.reset_after, "failures": self.failures})
+
+
+breaker = CircuitBreaker(IBM_BREAKER_THRESHOLD, IBM_BREAKER_RESET)
+
+
+def is_configured() -> bool:
+    return bool(IBM_API_KEY and IBM_URL)
+
+
+def watson_status() -> dict:
+    return {
+        "configured": is_configured(),
+        "client_ready": _client is not None,
+        "circuit": breaker.state,
+        "consecutive_failures": breaker.failures,
+        "last_error": breaker.last_error,
+    }
+
+
+async def warm_up():
+    """Import the SDK, build the client and fetch the first IAM token off the request path.
+
+    Raises on failure; the keepalive task keeps retrying the token refresh afterwards.
+    """
+    if not is_configured():
+        return
+    await providers.run_blocking("watson", _refresh_token)
+    log.info("watson client ready")
+
+
+async def keepalive():
+    """Lifespan task: keep the token fresh and close the breaker once Watson recovers."""
+    while True:
+        await asyncio.sleep(IBM_PROBE_INTERVAL)
+        if not is_configured():
+            continue
+        try:
+            if breaker.state == "closed":
+                await providers.run_blocking("watson", _refresh_token)
+            else:
+                await providers.run_blocking("watson", _probe)
+                breaker.success()
+                log.info("probe succeeded, circuit closed")
+        except Exception as e:
+            log.warning("keepalive error", extra={"error": str(e)})
+
+
+async def analyze_sentiment(text: str) -> dict:
     """Analyze sentiment and emotion using IBM Watson NLU."""
 
     # ── Pre-flight checks ─────────────────────────────────────────
     if not IBM_API_KEY:
-        print("[IBM] ERROR: IBM_API_KEY is not set in .env")
-        return _fallback_sentiment(text, reason="IBM_API_KEY is missing from .env")
+        log.error("IBM_API_KEY is not set in .env")
+        return _fallback_sentiment(text, reason="IBM_API_KEY is missing from .env", kind="missing_key")
 
     if not IBM_URL:
-        print("[IBM] ERROR: IBM_URL is not set in .env")
-        return _fallback_sentiment(text, reason="IBM_URL is missing from .env")
+        log.error("IBM_URL is not set in .env")
+        return _fallback_sentiment(text, reason="IBM_URL is missing from .env", kind="missing_url")
 
-    print(f"[IBM] API key prefix: {IBM_API_KEY[:8]}...")
-    print(f"[IBM] URL: {IBM_URL}")
+    if not breaker.allow():
+        return _fallback_sentiment(text, reason=f"IBM Watson is temporarily unavailable ({breaker.last_error})",
+                                   kind="circuit_open")
 
-    # ── Try IBM SDK ────────────────────────────────────────────────
+    # ── Try IBM SDK (blocking, so it runs off the event loop) ──────
     try:
-        from ibm_watson import NaturalLanguageUnderstandingV1
-        from ibm_watson.natural_language_understanding_v1 import (
-            Features, SentimentOptions, EmotionOptions, KeywordsOptions
-        )
-        from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+        response = await providers.run_blocking("watson", _watson_analyze, text)
     except ImportError as e:
-        print(f"[IBM] ImportError: {e} — run: pip install ibm-watson")
-        return _fallback_sentiment(text, reason=f"ibm-watson package not installed: {e}")
-
-    try:
-        authenticator = IAMAuthenticator(IBM_API_KEY)
-        nlu = NaturalLanguageUnderstandingV1(
-            version='2022-04-07',
-            authenticator=authenticator
-        )
-
-        # Ensure URL has no trailing slash and has https://
-        url = IBM_URL.rstrip('/')
-        if not url.startswith('http'):
-            url = 'https://' + url
-        nlu.set_service_url(url)
-
-        # Watson needs at least ~100 chars to detect language reliably
-        analysis_text = text
-        if len(text) < 100:
-            analysis_text = (text + " ") * (100 // len(text) + 1)
-            analysis_text = analysis_text[:300].strip()
-            print(f"[IBM] Text too short ({len(text)} chars), padding to {len(analysis_text)} chars")
-
-        print(f"[IBM] Sending request ({len(analysis_text)} chars)...")
-        response = nlu.analyze(
-            text=analysis_text,
-            language='en',
-            features=Features(
-                sentiment=SentimentOptions(),
-                emotion=EmotionOptions(),
-                keywords=KeywordsOptions(sentiment=True, limit=5),
-            )
-        ).get_result()
-
-        print(f"[IBM] Success!")
-
-        sentiment = response.get("sentiment", {}).get("document", {})
-        emotion   = response.get("emotion", {}).get("document", {}).get("emotion", {})
-        keywords  = response.get("keywords", [])
-        dominant_emotion = max(emotion, key=emotion.get) if emotion else "neutral"
-        brand_insights   = _generate_brand_insights(sentiment, emotion, dominant_emotion)
-
-        return {
-            "success": True,
-            "sentiment": {
-                "label": sentiment.get("label", "neutral"),
-                "score": round(sentiment.get("score", 0), 3),
-            },
-            "emotions":         {k: round(v, 3) for k, v in emotion.items()},
-            "dominant_emotion": dominant_emotion,
-            "keywords":         [kw["text"] for kw in keywords[:5]],
-            "brand_insights":   brand_insights,
-            "fallback":         False
-        }
-
+        breaker.release()
+        log.error("ibm-watson not installed — run: pip install ibm-watson", extra={"error": str(e)})
+        return _fallback_sentiment(text, reason=f"ibm-watson package not installed: {e}", kind="import_error")
+    except RateLimited:
+        # Shed before the call was made: our own limit, not a Watson outage
+        breaker.release()
+        return _fallback_sentiment(text, reason="IBM Watson is busy, used local analysis", kind="rate_limited")
     except Exception as e:
         err_str = str(e)
-        print(f"[IBM] Exception: {err_str}")
+        log.warning("watson error", extra={"error": err_str})
+        # Bad input is not an outage
+        if not ("422" in err_str or "not enough text" in err_str.lower()):
+            breaker.failure(err_str[:200])
+        else:
+            breaker.release()
 
         # Give specific, actionable error messages
         if "401" in err_str or "Unauthorized" in err_str or "invalid_credentials" in err_str.lower():
@@ -103,7 +211,50 @@ def analyze_sentiment(text: str) -> dict:
         else:
             reason = f"IBM Watson error: {err_str}"
 
-        return _fallback_sentiment(text, reason=reason)
+        return _fallback_sentiment(text, reason=reason, kind="watson_error")
+
+    breaker.success()
+    log.info("watson analysis succeeded")
+
+    sentiment = response.get("sentiment", {}).get("document", {})
+    emotion   = response.get("emotion", {}).get("document", {}).get("emotion", {})
+    keywords  = response.get("keywords", [])
+    dominant_emotion = max(emotion, key=emotion.get) if emotion else "neutral"
+    brand_insights   = _generate_brand_insights(sentiment, emotion, dominant_emotion)
+
+    return {
+        "success": True,
+        "sentiment": {
+            "label": sentiment.get("label", "neutral"),
+            "score": round(sentiment.get("score", 0), 3),
+        },
+        "emotions":         {k: round(v, 3) for k, v in emotion.items()},
+        "dominant_emotion": dominant_emotion,
+        "keywords":         [kw["text"] for kw in keywords[:5]],
+        "brand_insights":   brand_insights,
+        "fallback":         False,
+        "backend":          "watson",
+    }
+
+
+def _watson_analyze(text: str) -> dict:
+    """Synchronous Watson NLU call; run via providers.run_blocking."""
+    from ibm_watson.natural_language_understanding_v1 import (
+        Features, SentimentOptions, EmotionOptions, KeywordsOptions
+    )
+
+    nlu = _get_client()
+
+    log.info("sending watson request", extra={"chars": len(text)})
+    return nlu.analyze(
+        text=text,
+        language='en',
+        features=Features(
+            sentiment=SentimentOptions(),
+            emotion=EmotionOptions(),
+            keywords=KeywordsOptions(sentiment=True, limit=5),
+        )
+    ).get_result()
 
 
 def _generate_brand_insights(sentiment: dict, emotion: dict, dominant_emotion: str) -> list:
@@ -133,28 +284,31 @@ def _generate_brand_insights(sentiment: dict, emotion: dict, dominant_emotion: s
     return insights
 
 
-def _fallback_sentiment(text: str, reason: str = "IBM Watson unavailable") -> dict:
-    """Keyword-based fallback with specific error reason."""
-    positive_words = ["great","amazing","innovative","love","best","excellent","powerful","inspiring","beautiful","simple","easy","fast","accessible","sustainable","joyful"]
-    negative_words = ["bad","poor","terrible","hard","difficult","slow","complex","expensive","limited","compromise"]
-
-    text_lower = text.lower()
-    pos = sum(1 for w in positive_words if w in text_lower)
-    neg = sum(1 for w in negative_words if w in text_lower)
-
-    if pos > neg:
-        label, score = "positive", min(round(0.3 + pos * 0.08, 2), 1.0)
-    elif neg > pos:
-        label, score = "negative", min(round(0.3 + neg * 0.08, 2), 1.0)
-    else:
-        label, score = "neutral", 0.1
-
+def local_analysis(text: str, notes: list = None, fallback: bool = False, scores: dict = None) -> dict:
+    """Result in the Watson response shape, scored by the offline lexicon engine."""
+    scores = scores or local_sentiment.score(text)
+    insights = _generate_brand_insights(
+        {"label": scores["label"], "score": abs(scores["score"])},
+        scores["emotions"],
+        scores["dominant_emotion"],
+    )
     return {
         "success":          True,
-        "sentiment":        {"label": label, "score": score},
-        "emotions":         {"joy": 0.4, "sadness": 0.1, "anger": 0.0, "fear": 0.1, "disgust": 0.0},
-        "dominant_emotion": "joy",
-        "keywords":         [],
-        "brand_insights":   [f"⚠️ {reason}", "ℹ️ Showing basic keyword-based analysis instead."],
-        "fallback":         True
-    }
\ No newline at end of file
+        "sentiment":        {"label": scores["label"], "score": scores["score"]},
+        "emotions":         scores["emotions"],
+        "dominant_emotion": scores["dominant_emotion"],
+        "keywords":         scores["keywords"],
+        "brand_insights":   (notes or []) + insights,
+        "fallback":         fallback,
+        "backend":          "local",
+    }
+
+
+def _fallback_sentiment(text: str, reason: str = "IBM Watson unavailable", kind: str = "other") -> dict:
+    """Local lexicon analysis with the specific reason Watson was skipped."""
+    metrics.FALLBACKS.inc(service="sentiment", reason=kind)
+    return local_analysis(
+        text,
+        notes=[f"⚠️ {reason}", "ℹ️ Showing local lexicon-based analysis instead."],
+        fallback=True,
+    )
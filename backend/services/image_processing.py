@@ -0,0 +1,114 @@
+import io
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops, features
+
+from backend.services import image_store
+from backend.services.settings import settings
+
+IMAGE_PROCESS_WORKERS = settings.image_process_workers
+LOGO_VARIANT_FORMATS = list(settings.logo_variant_formats)
+
+# Variant name -> longest edge in px (None keeps the original size)
+VARIANT_SIZES = {
+    "favicon": 32,
+    "256": 256,
+    "512": 512,
+    "full": None,
+}
+
+# Pixels with every channel at or above this are treated as background
+WHITE_THRESHOLD = 245
+
+_ENCODERS = {
+    "webp": {"format": "WEBP", "quality": 85, "method": 4},
+    "png":  {"format": "PNG", "optimize": True},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+_executor = None
+
+
+def _executor_pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the pool starts while warm-up threads are running, and a
+        # forked child can inherit a lock held by one of them and deadlock
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_PROCESS_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown():
+    """Stop the worker processes (called from the FastAPI lifespan)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _ready() -> bool:
+    return True
+
+
+async def warm_up():
+    """Start the worker processes now so the first logo doesn't pay process spawn + PIL import."""
+    loop = asyncio.get_running_loop()
+    pool = _executor_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, _ready) for _ in range(IMAGE_PROCESS_WORKERS)))
+
+
+def _remove_white_background(img: Image.Image) -> Image.Image:
+    rgba = img.convert("RGBA")
+    r, g, b, _ = rgba.split()
+    darkest = ImageChops.darker(ImageChops.darker(r, g), b)
+    rgba.putalpha(darkest.point(lambda v: 0 if v >= WHITE_THRESHOLD else 255))
+    return rgba
+
+
+def build_variants(data: bytes, remove_background: bool, formats: list) -> list:
+    """CPU-bound: decode once, emit (size_name, format, bytes) for every size/format.
+
+    Re-encoding from pixels drops EXIF/text chunks, so outputs carry no metadata.
+    """
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    img = _remove_white_background(img) if remove_background else img.convert("RGBA")
+
+    out = []
+    for name, edge in VARIANT_SIZES.items():
+        sized = img
+        if edge and max(img.size) > edge:
+            sized = img.copy()
+            sized.thumbnail((edge, edge), Image.LANCZOS)
+        for fmt in formats:
+            if fmt not in _ENCODERS or (fmt != "png" and not features.check(fmt)):
+                continue
+            buf = io.BytesIO()
+            sized.save(buf, **_ENCODERS[fmt])
+            out.append((name, fmt, buf.getvalue()))
+    return out
+
+
+async def process_logo(image_hash: str, data: bytes, remove_background: bool = False) -> dict:
+    """Build (or reuse) stored variants for a logo: {size: {format: url}}."""
+    manifest_name = "variants-alpha" if remove_background else "variants"
+    cached = await image_store.load_manifest(image_hash, manifest_name)
+    if cached is not None:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    built = await loop.run_in_executor(
+        _executor_pool(), build_variants, data, remove_background, LOGO_VARIANT_FORMATS
+    )
+
+    variants: dict = {}
+    for name, fmt, blob in built:
+        variant_hash = await image_store.save(blob)
+        variants.setdefault(name, {})[fmt] = {
+            "url": image_store.url_for(variant_hash),
+            "bytes": len(blob),
+        }
+    await image_store.save_manifest(image_hash, manifest_name, variants)
+    return variants
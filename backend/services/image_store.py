@@ -0,0 +1,85 @@
+import os
+import re
+import json
+import asyncio
+import hashlib
+
+from backend.services.settings import settings
+
+IMAGE_STORE_DIR = settings.image_store_dir
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+]
+
+
+def sniff_content_type(head: bytes) -> str:
+    for magic, ctype in _MAGIC:
+        if head.startswith(magic):
+            return ctype
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif"
+    return "application/octet-stream"
+
+
+def path_for(image_hash: str) -> str:
+    """Filesystem path for a stored blob; raises ValueError on malformed hashes."""
+    if not HASH_RE.match(image_hash):
+        raise ValueError("Invalid image hash")
+    return os.path.join(IMAGE_STORE_DIR, image_hash[:2], image_hash)
+
+
+def _write(data: bytes) -> str:
+    image_hash = hashlib.sha256(data).hexdigest()
+    path = path_for(image_hash)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return image_hash
+
+
+async def save(data: bytes) -> str:
+    """Store bytes once under their sha256 and return the hash."""
+    return await asyncio.to_thread(_write, data)
+
+
+def url_for(image_hash: str) -> str:
+    return f"/api/images/{image_hash}"
+
+
+def _manifest_path(image_hash: str, name: str) -> str:
+    return f"{path_for(image_hash)}.{name}.json"
+
+
+def _read_manifest(image_hash: str, name: str):
+    try:
+        with open(_manifest_path(image_hash, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(image_hash: str, name: str, data: dict):
+    path = _manifest_path(image_hash, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+async def load_manifest(image_hash: str, name: str):
+    """Read derived metadata (e.g. variant lists) stored next to a blob."""
+    return await asyncio.to_thread(_read_manifest, image_hash, name)
+
+
+async def save_manifest(image_hash: str, name: str, data: dict):
+    await asyncio.to_thread(_write_manifest, image_hash, name, data)
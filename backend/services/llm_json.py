@@ -0,0 +1,135 @@
+import re
+import json
+
+# Tolerant JSON extraction for LLM output: prose before/after the payload, markdown
+# fences, trailing commas. Everything here is pure string work; no network calls.
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_OPENERS = {"{": "}", "[": "]"}
+
+
+class LLMOutputError(ValueError):
+    """The model's reply contained no usable JSON (or none matching the expected schema)."""
+
+
+def _loads(candidate: str):
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        # The most common near-miss from LLMs; cheap to fix locally
+        return json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+
+
+def _balanced_end(text: str, start: int) -> int:
+    """Index just past the bracket that closes text[start], or -1 if it never closes."""
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def extract_json(text: str, want: type = dict):
+    """Return the first complete JSON value of type `want` found in text.
+
+    Scans forward from each opening bracket, so a stray "{" in leading prose only costs
+    one failed candidate. Raises LLMOutputError when nothing parses.
+    """
+    opener = "{" if want is dict else "["
+    pos = text.find(opener)
+    while pos != -1:
+        end = _balanced_end(text, pos)
+        if end == -1:
+            # Unclosed here; a later opener may still start a complete value
+            pos = text.find(opener, pos + 1)
+            continue
+        try:
+            value = _loads(text[pos:end])
+            if isinstance(value, want):
+                return value
+        except json.JSONDecodeError:
+            pass
+        pos = text.find(opener, pos + 1)
+    raise LLMOutputError(f"No complete JSON {want.__name__} in model output ({len(text)} chars)")
+
+
+class ArrayItemStream:
+    """Incrementally yield complete items of the array under `key` as text arrives.
+
+    feed() returns the items completed by that chunk, e.g. each brand name object as soon
+    as its closing brace has streamed in. Items that fail to parse are skipped; callers
+    re-validate the full text at the end anyway.
+    """
+
+    def __init__(self, key: str):
+        self._key = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buf = ""
+        self._pos = -1  # scan cursor inside the array; -1 until the key is seen
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start = -1
+        self.done = False
+
+    def feed(self, chunk: str) -> list:
+        self._buf += chunk
+        if self.done:
+            return []
+        if self._pos == -1:
+            match = self._key.search(self._buf)
+            if not match:
+                return []
+            self._pos = match.end()
+
+        items = []
+        buf = self._buf
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 0:  # a bare string item
+                        items.append(json.loads(buf[self._item_start:self._pos + 1]))
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 0:
+                    self._item_start = self._pos
+            elif ch in _OPENERS:
+                if self._depth == 0:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:  # the array itself closed
+                    self.done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(_loads(buf[self._item_start:self._pos + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = -1
+            self._pos += 1
+        return items
+
+    @property
+    def text(self) -> str:
+        return self._buf
@@ -0,0 +1,193 @@
+# Offline lexicon sentiment/emotion engine (VADER-style rules, no network).
+# Lookup tables are plain dicts/frozensets built once at import, so scoring is a
+# single pass of hash lookups per token.
+import re
+import math
+from collections import Counter
+
+# Valence on VADER's -4..+4 scale, trimmed to words that show up in brand/marketing copy
+LEXICON = {
+    # positive
+    "accessible": 1.6, "affordable": 1.5, "amazing": 2.8, "authentic": 1.8, "awesome": 3.1,
+    "beautiful": 2.9, "beloved": 2.7, "best": 3.2, "better": 1.9, "bold": 1.1, "brilliant": 2.8,
+    "calm": 1.3, "care": 1.8, "cares": 1.8, "caring": 2.0, "celebrate": 2.7, "charming": 2.5,
+    "clean": 1.7, "clever": 2.0, "comfort": 1.5, "comfortable": 1.8, "confident": 2.2,
+    "convenient": 1.6, "creative": 1.9, "delight": 2.9, "delightful": 2.9, "dependable": 1.9,
+    "easy": 1.9, "effortless": 2.0, "elegant": 2.1, "empower": 1.9, "empowering": 2.0,
+    "enjoy": 2.2, "excellent": 2.7, "exceptional": 2.6, "exciting": 2.2, "fantastic": 2.6,
+    "fast": 1.2, "favorite": 2.0, "fresh": 1.3, "friendly": 2.2, "fun": 2.3, "generous": 2.3,
+    "gentle": 1.6, "genuine": 1.9, "glad": 2.0, "good": 1.9, "great": 3.1, "happy": 2.7,
+    "healthy": 1.7, "helpful": 1.8, "honest": 2.3, "hope": 1.9, "ideal": 2.0, "impressive": 2.3,
+    "innovative": 1.9, "inspire": 2.3, "inspiring": 2.4, "joy": 2.8, "joyful": 2.9, "kind": 2.4,
+    "love": 3.2, "loved": 2.9, "lovely": 2.8, "loyal": 2.1, "luxurious": 2.0, "magic": 2.0,
+    "memorable": 1.9, "modern": 0.8, "nice": 1.8, "passion": 2.2, "passionate": 2.3,
+    "peace": 2.5, "perfect": 2.7, "pleasant": 2.3, "pleasure": 2.7, "powerful": 1.8,
+    "premium": 1.4, "proud": 2.1, "quality": 1.5, "reliable": 2.0, "remarkable": 2.2,
+    "reward": 2.0, "rewarding": 2.2, "safe": 1.9, "satisfied": 2.2, "seamless": 1.8,
+    "secure": 1.9, "simple": 1.2, "smart": 1.7, "smooth": 1.4, "special": 1.7, "strong": 1.6,
+    "stunning": 2.7, "success": 2.7, "successful": 2.8, "superb": 3.1, "support": 1.7,
+    "sustainable": 1.5, "thrilled": 2.9, "trust": 2.3, "trusted": 2.2, "trustworthy": 2.4,
+    "unique": 1.6, "valuable": 2.1, "vibrant": 2.0, "warm": 1.6, "welcome": 2.0, "win": 2.8,
+    "wonderful": 2.7, "worth": 1.6,
+    # negative
+    "angry": -2.3, "annoying": -2.1, "awful": -2.0, "bad": -2.5, "boring": -1.3, "broken": -2.1,
+    "cheap": -0.5, "clunky": -1.4, "complex": -0.8, "complicated": -1.4, "compromise": -0.8,
+    "confusing": -1.6, "costly": -1.2, "crisis": -3.1, "damage": -2.2, "danger": -2.4,
+    "dangerous": -2.1, "difficult": -1.5, "disappoint": -2.3, "disappointed": -1.9,
+    "disappointing": -2.2, "dull": -1.7, "expensive": -1.3, "fail": -2.5, "failure": -2.3,
+    "fake": -2.1, "fear": -2.2, "frustrated": -2.4, "frustrating": -2.1, "hard": -0.4,
+    "harm": -2.5, "hate": -2.7, "horrible": -2.5, "hurt": -2.4, "inferior": -1.7,
+    "limited": -0.8, "lose": -1.6, "loss": -1.3, "mediocre": -1.2, "mess": -1.5, "messy": -1.5,
+    "miss": -0.6, "painful": -2.4, "poor": -2.1, "problem": -1.7, "problems": -1.7, "risk": -1.1,
+    "risky": -1.2, "sad": -2.1, "scary": -2.2, "slow": -0.8, "stress": -1.8, "stressful": -2.1,
+    "struggle": -1.6, "terrible": -2.1, "tired": -1.9, "ugly": -2.3, "unfair": -2.1,
+    "unhappy": -1.8, "unreliable": -1.9, "useless": -1.8, "waste": -1.8, "weak": -1.9,
+    "worried": -1.2, "worry": -1.9, "worse": -2.1, "worst": -3.1, "wrong": -2.1,
+}
+
+# Word -> emotion, in the same five categories Watson NLU returns
+EMOTION_LEXICON = {
+    "joy": {
+        "amazing", "awesome", "beautiful", "celebrate", "delight", "delightful", "enjoy", "exciting",
+        "fun", "glad", "happy", "joy", "joyful", "love", "loved", "lovely", "pleasure", "proud",
+        "smile", "thrilled", "wonderful", "win", "success", "inspiring", "vibrant", "warm",
+    },
+    "sadness": {
+        "alone", "disappointed", "disappointing", "loss", "lose", "lonely", "miss", "sad", "sorry",
+        "tired", "unhappy", "hurt", "struggle", "painful",
+    },
+    "anger": {
+        "angry", "annoying", "frustrated", "frustrating", "hate", "outrage", "unfair", "furious",
+        "mad", "rage",
+    },
+    "fear": {
+        "afraid", "anxious", "danger", "dangerous", "fear", "risk", "risky", "scary", "stress",
+        "stressful", "worried", "worry", "crisis", "threat", "urgent", "hurry", "limited",
+    },
+    "disgust": {
+        "awful", "disgusting", "fake", "gross", "horrible", "mess", "messy", "nasty", "ugly",
+        "waste", "cheap",
+    },
+}
+EMOTIONS = tuple(EMOTION_LEXICON)
+_WORD_EMOTIONS = {}
+for _emotion, _words in EMOTION_LEXICON.items():
+    for _word in _words:
+        _WORD_EMOTIONS.setdefault(_word, []).append(_emotion)
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot",
+    "cant", "can't", "dont", "don't", "doesnt", "doesn't", "didnt", "didn't", "isnt", "isn't",
+    "wasnt", "wasn't", "wont", "won't", "aint", "ain't", "arent", "aren't", "shouldnt",
+    "shouldn't", "wouldnt", "wouldn't", "couldnt", "couldn't", "hardly", "rarely",
+})
+
+BOOSTERS = {
+    "absolutely": 0.293, "completely": 0.293, "deeply": 0.293, "especially": 0.293,
+    "extremely": 0.293, "highly": 0.293, "incredibly": 0.293, "really": 0.293, "so": 0.293,
+    "super": 0.293, "totally": 0.293, "truly": 0.293, "very": 0.293, "most": 0.293,
+    "barely": -0.293, "slightly": -0.293, "somewhat": -0.293, "kinda": -0.293, "little": -0.293,
+    "partly": -0.293, "marginally": -0.293,
+}
+
+STOPWORDS = frozenset({
+    "about", "after", "again", "also", "been", "before", "being", "between", "both", "brand",
+    "could", "does", "doing", "each", "every", "everyone", "from", "have", "having", "here",
+    "into", "just", "more", "most", "much", "only", "other", "ours", "over", "same", "should",
+    "some", "such", "than", "that", "their", "them", "then", "there", "these", "they", "this",
+    "those", "through", "very", "were", "what", "when", "where", "which", "while", "will",
+    "with", "would", "your", "yours", "our", "who", "whom", "why", "how", "and", "the", "for",
+    "are", "but", "not", "you", "all", "can", "her", "his", "its", "out", "was", "has",
+})
+
+NEGATION_SCALAR = -0.74
+BUT_BEFORE, BUT_AFTER = 0.5, 1.5
+ALPHA = 15  # VADER normalisation constant
+
+_TOKEN_RE = re.compile(r"[a-z][a-z']*")
+
+
+def _tokens(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize(total: float) -> float:
+    return total / math.sqrt(total * total + ALPHA)
+
+
+def _score_tokens(tokens: list, exclamations: int) -> dict:
+    valences = []
+    emotion_counts = Counter()
+    but_at = None
+
+    for i, token in enumerate(tokens):
+        if token == "but" and but_at is None:
+            but_at = i
+        valence = LEXICON.get(token)
+        if valence is None:
+            valences.append(0.0)
+            continue
+
+        # Up to three preceding words can boost, dampen or negate
+        negated = False
+        for distance, prev in enumerate(reversed(tokens[max(0, i - 3):i]), start=1):
+            boost = BOOSTERS.get(prev)
+            if boost is not None:
+                scale = 1.0 if distance == 1 else (0.95 if distance == 2 else 0.9)
+                valence += math.copysign(boost * scale, valence)
+            if prev in NEGATIONS:
+                negated = True
+        if negated:
+            valence *= NEGATION_SCALAR
+        valences.append(valence)
+
+        if not negated:
+            for emotion in _WORD_EMOTIONS.get(token, ()):
+                emotion_counts[emotion] += 1
+
+    if but_at is not None:
+        valences = [v * (BUT_BEFORE if i < but_at else BUT_AFTER) for i, v in enumerate(valences)]
+
+    total = sum(valences)
+    if total:
+        total += math.copysign(min(exclamations, 4) * 0.292, total)
+    compound = _normalize(total) if total else 0.0
+
+    if compound >= 0.05:
+        label = "positive"
+    elif compound <= -0.05:
+        label = "negative"
+    else:
+        label = "neutral"
+
+    hits = sum(emotion_counts.values())
+    emotions = {e: round(emotion_counts[e] / hits, 3) if hits else 0.0 for e in EMOTIONS}
+    dominant = max(emotions, key=emotions.get) if hits else "neutral"
+
+    keywords = [w for w, _ in Counter(
+        t for t in tokens if len(t) > 3 and t not in STOPWORDS and t not in BOOSTERS
+    ).most_common(5)]
+
+    return {
+        "label": label,
+        "score": round(compound, 3),
+        "emotions": emotions,
+        "dominant_emotion": dominant,
+        "keywords": keywords,
+    }
+
+
+def score(text: str) -> dict:
+    """Sentiment label/score (-1..1), emotion shares, dominant emotion and keywords."""
+    return _score_tokens(_tokens(text), text.count("!"))
+
+
+def score_batch(texts: list) -> list:
+    """score() for many texts; repeated texts in the batch (common in bulk copy checks) are scored once."""
+    scored = {}
+    for text in texts:
+        if text not in scored:
+            scored[text] = score(text)
+    # Fresh containers per item so no two results share mutable state
+    return [{**scored[t], "emotions": dict(scored[t]["emotions"]), "keywords": list(scored[t]["keywords"])}
+            for t in texts]
@@ -0,0 +1,228 @@
+import time
+import uuid
+import asyncio
+
+from backend.services.cache import make_key
+from backend.services.diffusion_service import generate_logo
+from backend.services.logs import get_logger
+from backend.services import rate_limit, shared_state
+from backend.services.settings import settings
+
+LOGO_WORKERS = settings.logo_workers
+LOGO_QUEUE_SIZE = settings.logo_queue_size
+LOGO_JOB_TTL = settings.logo_job_ttl
+# A queued/running job whose worker stopped heartbeating this long ago is failed
+LOGO_JOB_STALE_AFTER = settings.logo_job_stale_after
+# Rate-limit waits per job before giving up
+LOGO_JOB_MAX_RETRIES = settings.logo_job_max_retries
+
+log = get_logger("logo_jobs")
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("done", "failed")
+LOST_ERROR = "The logo worker stopped before finishing this job, please try again"
+
+
+class JobStore:
+    """Storage interface for logo jobs."""
+
+    async def get(self, job_id: str):
+        raise NotImplementedError
+
+    async def put(self, job: dict):
+        raise NotImplementedError
+
+    async def delete(self, job: dict):
+        raise NotImplementedError
+
+    async def claim(self, job: dict):
+        """Atomically mark job as the active one for its prompt key.
+
+        Returns None if the claim was taken, else the queued/running job that already holds it.
+        """
+        raise NotImplementedError
+
+    async def touch(self, job_ids: list):
+        """Record that this process still owns these jobs."""
+        raise NotImplementedError
+
+
+class SharedJobStore(JobStore):
+    """Jobs in the shared state backend, so any worker can answer a status poll and
+    identical prompts submitted to different workers coalesce onto one job."""
+
+    JOBS = "logo_jobs"
+    ACTIVE = "logo_active"
+    HEARTBEATS = "logo_heartbeats"
+    # A claim outlives any real job; it only matters if the owning worker died mid-job
+    CLAIM_TTL = 900.0
+
+    def __init__(self, ttl: float = LOGO_JOB_TTL):
+        self.ttl = ttl
+
+    async def get(self, job_id: str):
+        """The job, failed first if it is queued/running but its worker stopped heartbeating."""
+        state = shared_state.backend()
+        job = await state.get(self.JOBS, job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return job
+        if await state.get(self.HEARTBEATS, job_id) is None:
+            log.warning("logo job lost", extra={"job_id": job_id, "status": job["status"]})
+            job.update(status="failed", error=LOST_ERROR, updated_at=time.time())
+            await self.put(job)
+        return job
+
+    async def put(self, job: dict):
+        state = shared_state.backend()
+        await state.set(self.JOBS, job["id"], job, self.ttl)
+        if job["status"] in TERMINAL_STATUSES:
+            await state.delete(self.ACTIVE, job["key"], only_if=job["id"])
+
+    async def delete(self, job: dict):
+        state = shared_state.backend()
+        await state.delete(self.JOBS, job["id"])
+        await state.delete(self.ACTIVE, job["key"], only_if=job["id"])
+        await state.delete(self.HEARTBEATS, job["id"])
+
+    async def touch(self, job_ids: list):
+        state = shared_state.backend()
+        for job_id in job_ids:
+            await state.set(self.HEARTBEATS, job_id, time.time(), LOGO_JOB_STALE_AFTER)
+
+    async def claim(self, job: dict):
+        state = shared_state.backend()
+        for _ in range(2):
+            if await state.add(self.ACTIVE, job["key"], job["id"], self.CLAIM_TTL):
+                return None
+            holder = await state.get(self.ACTIVE, job["key"])
+            existing = await self.get(holder) if holder else None
+            if existing is not None and existing["status"] in ACTIVE_STATUSES:
+                return existing
+            # Stale claim (job expired or finished without clearing it): take it over once
+            if holder:
+                await state.delete(self.ACTIVE, job["key"], only_if=holder)
+        return None
+
+
+class LogoJobQueue:
+    """Bounded worker pool running generate_logo off the request path."""
+
+    def __init__(self, store: JobStore, workers: int = LOGO_WORKERS, maxsize: int = LOGO_QUEUE_SIZE):
+        self.store = store
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queue = None
+        self._tasks: list = []
+        self._owned: set = set()  # queued/running job ids this process heartbeats for
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, params: dict) -> dict:
+        """Queue a job, or return the in-flight job for an identical prompt."""
+        if self._queue is None:
+            await self.start()
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "key": make_key("logo", params),
+            "status": "queued",
+            "params": params,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        existing = await self.store.claim(job)
+        if existing is not None:
+            return existing
+        await self.store.touch([job["id"]])
+        await self.store.put(job)
+        try:
+            self._queue.put_nowait(job["id"])
+        except asyncio.QueueFull:
+            await self.store.delete(job)
+            raise
+        self._owned.add(job["id"])
+        return job
+
+    async def _update(self, job: dict, **fields):
+        job.update(fields, updated_at=time.time())
+        await self.store.put(job)
+
+    async def _worker(self, n: int):
+        rate_limit.priority.set("low")
+        while True:
+            job_id = await self._queue.get()
+            job = None
+            try:
+                job = await self.store.get(job_id)
+                if job is None:
+                    continue
+                await self._update(job, status="running")
+                log.info("logo job running", extra={"job_id": job_id, "worker": n})
+                result = await self._run(job)
+                if result.get("success"):
+                    await self._update(job, status="done", result=result)
+                else:
+                    await self._update(job, status="failed", result=result, error=result.get("error"))
+            except Exception as e:
+                # Store errors (database locked, Redis down) fail this job, not the worker
+                log.exception("logo job error", extra={"job_id": job_id, "worker": n})
+                await self._fail(job, str(e) or type(e).__name__)
+            finally:
+                self._owned.discard(job_id)
+                self._queue.task_done()
+
+    async def _heartbeat(self):
+        """Keep this process's jobs from being taken for orphans while they wait or run."""
+        while True:
+            await asyncio.sleep(LOGO_JOB_STALE_AFTER / 4)
+            try:
+                await self.store.touch(list(self._owned))
+            except Exception:
+                log.exception("logo job heartbeat failed")
+
+    async def _fail(self, job: dict, error: str):
+        if job is None:
+            return
+        try:
+            await self._update(job, status="failed", error=error)
+        except Exception:
+            log.exception("could not mark logo job failed", extra={"job_id": job["id"]})
+
+    async def _run(self, job: dict) -> dict:
+        """generate_logo, waiting out provider rate limits (a bounded number of times)."""
+        for attempt in range(LOGO_JOB_MAX_RETRIES + 1):
+            try:
+                return await generate_logo(**job["params"])
+            except rate_limit.RateLimited as e:
+                if attempt == LOGO_JOB_MAX_RETRIES:
+                    return {"success": False, "error": "Logo service is busy, please try again shortly"}
+                log.info("logo job throttled", extra={"job_id": job["id"], "retry_after_s": round(e.retry_after, 2)})
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+
+def public_view(job: dict) -> dict:
+    """Job fields safe to return to clients."""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+logo_queue = LogoJobQueue(SharedJobStore())
@@ -0,0 +1,133 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Minimal in-process Prometheus registry (text exposition format 0.0.4).
+# Each uvicorn worker keeps its own series; scrape every worker or run one per pod.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry: list = []
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labels
+        self._values: dict = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labels, buckets
+        self._series: dict = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            labels = _labels(self.labelnames, key)
+            for bound, count in zip(self.buckets, series["counts"]):
+                bucket = _labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket} {count}")
+            bucket = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket} {series['count']}")
+            lines.append(f"{self.name}_sum{labels} {series['sum']}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+def render() -> str:
+    with _lock:
+        lines = [line for metric in _registry for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+# ── BrandCraft metrics ──────────────────────────────────────────
+HTTP_LATENCY = Histogram(
+    "brandcraft_http_request_duration_seconds", "End-to-end request latency by route.",
+    ("route", "method", "status"),
+)
+UPSTREAM_LATENCY = Histogram(
+    "brandcraft_upstream_request_duration_seconds", "Upstream provider call latency.",
+    ("provider", "model", "status"),
+)
+UPSTREAM_QUEUE_WAIT = Histogram(
+    "brandcraft_upstream_queue_wait_seconds", "Time spent waiting for a provider concurrency slot.",
+    ("provider",),
+)
+UPSTREAM_RETRIES = Counter(
+    "brandcraft_upstream_retries_total", "Upstream retries after 429/503.",
+    ("provider", "status"),
+)
+PARSE_LATENCY = Histogram(
+    "brandcraft_llm_parse_duration_seconds", "Time spent extracting JSON from LLM output.",
+    ("operation",), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+CACHE_REQUESTS = Counter(
+    "brandcraft_cache_requests_total", "Cache lookups by cache and result.",
+    ("cache", "result"),
+)
+FALLBACKS = Counter(
+    "brandcraft_fallback_total", "Requests served by a fallback path.",
+    ("service", "reason"),
+)
+LOGO_ATTEMPTS = Counter(
+    "brandcraft_logo_model_attempts_total", "Logo model attempts by outcome.",
+    ("model", "outcome"),
+)
+LLM_JSON_OUTCOMES = Counter(
+    "brandcraft_llm_json_total", "Structured LLM replies by outcome (ok, repaired, failed).",
+    ("schema", "outcome"),
+)
+RATE_LIMITED = Counter(
+    "brandcraft_rate_limited_total", "Requests or upstream calls shed by admission control.",
+    ("scope", "priority"),
+)
+PREFETCH = Counter(
+    "brandcraft_prefetch_total", "Speculative prefetch work by kind and outcome.",
+    ("kind", "outcome"),
+)
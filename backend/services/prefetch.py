@@ -0,0 +1,155 @@
+import asyncio
+
+from backend.services import metrics, rate_limit, shared_state
+from backend.services.cache import make_key, RESPONSE_CACHE_TTL
+from backend.services.diffusion_service import generate_logo_preview
+from backend.services.gemini_service import generate_brand_content
+from backend.services.logs import get_logger
+from backend.services.settings import settings
+
+# Speculative pipeline after /api/brand-name: while the user reads the names, warm the
+# taglines and a low-resolution logo preview for the top few, so the follow-up
+# /api/content or /api/logo (preview) click is a response-cache hit.
+#   - opt-in (PREFETCH_ENABLED), and killable at runtime for every worker via /api/prefetch
+#   - spends only idle provider capacity ("speculative" priority keeps 80% of each bucket free)
+#   - capped by its own budget of upstream calls per minute, per process
+PREFETCH_ENABLED = settings.prefetch_enabled
+PREFETCH_TOP_N = settings.prefetch_top_n
+PREFETCH_LOGOS = settings.prefetch_logos
+PREFETCH_BUDGET_PER_MIN = settings.prefetch_budget_per_min
+PREFETCH_MAX_INFLIGHT = settings.prefetch_max_inflight
+
+# What the frontend's logo form sends until the user changes it ("Use in Content" /
+# "Logo" on a name card fill in the brand name, the niche as industry, and the tone)
+LOGO_STYLE = "modern"
+LOGO_COLOR = "deep blue and white"
+
+# Shared-state namespaces: the kill switch, and which cache entries were speculative
+CONTROL = "prefetch_control"
+LEDGER = "prefetch_ledger"
+KILL_TTL = 365 * 86400.0
+
+log = get_logger("prefetch")
+
+# kind -> outcome -> count, for this process (the same numbers go to /metrics)
+USAGE: dict = {}
+
+_budget = rate_limit.TokenBucket(PREFETCH_BUDGET_PER_MIN / 60, PREFETCH_BUDGET_PER_MIN)
+_tasks: set = set()
+_inflight = 0
+
+
+def _count(kind: str, outcome: str):
+    USAGE.setdefault(kind, {})
+    USAGE[kind][outcome] = USAGE[kind].get(outcome, 0) + 1
+    metrics.PREFETCH.inc(kind=kind, outcome=outcome)
+
+
+def _ledger_key(kind: str, **fields) -> str:
+    return make_key(kind, fields)
+
+
+# ── Kill switch ─────────────────────────────────────────────────
+async def is_enabled() -> bool:
+    if not PREFETCH_ENABLED:
+        return False
+    return await shared_state.backend().get(CONTROL, "killed") is None
+
+
+async def set_enabled(enabled: bool):
+    """Turn speculative work off (or back on) for every worker sharing the state backend."""
+    state = shared_state.backend()
+    if enabled:
+        await state.delete(CONTROL, "killed")
+    else:
+        await state.set(CONTROL, "killed", True, KILL_TTL)
+    log.info("prefetch switched", extra={"enabled": enabled})
+
+
+# ── Speculation ─────────────────────────────────────────────────
+async def _speculate(kind: str, provider: str, ledger_key: str, fn):
+    """Run one speculative call if there is idle capacity and budget left."""
+    global _inflight
+    if _inflight >= PREFETCH_MAX_INFLIGHT or not rate_limit.idle(provider):
+        _count(kind, "skipped_busy")
+        return
+    if _budget.try_take(1):
+        _count(kind, "skipped_budget")
+        return
+    _inflight += 1
+    try:
+        result, cached = await fn()
+    except rate_limit.RateLimited:
+        _count(kind, "skipped_busy")
+        return
+    except Exception as e:
+        log.info("prefetch failed", extra={"kind": kind, "error": str(e) or type(e).__name__})
+        _count(kind, "failed")
+        return
+    finally:
+        _inflight -= 1
+    if result.get("success") is False:
+        _count(kind, "failed")
+        return
+    if cached:
+        _count(kind, "cached")
+        return
+    _count(kind, "done")
+    await shared_state.backend().set(LEDGER, ledger_key, kind, RESPONSE_CACHE_TTL)
+
+
+async def _run(names: list, niche: str, tone: str):
+    if not await is_enabled():
+        return
+    rate_limit.priority.set("speculative")
+    jobs = []
+    for name in names[:PREFETCH_TOP_N]:
+        jobs.append(_speculate(
+            "tagline", "openrouter", _ledger_key("tagline", brand_name=name, niche=niche, tone=tone),
+            lambda name=name: generate_brand_content(name, niche, "tagline", tone),
+        ))
+        if PREFETCH_LOGOS:
+            params = {"brand_name": name, "style": LOGO_STYLE, "primary_color": LOGO_COLOR, "industry": niche}
+            jobs.append(_speculate(
+                "logo_preview", "huggingface", _ledger_key("logo_preview", **params),
+                lambda params=params: generate_logo_preview(**params),
+            ))
+    await asyncio.gather(*jobs)
+
+
+def schedule(names: list, niche: str, tone: str):
+    """Start speculative follow-up work for freshly generated names; returns immediately."""
+    if not PREFETCH_ENABLED or PREFETCH_BUDGET_PER_MIN <= 0 or not names:
+        return
+    task = asyncio.create_task(_run([n["name"] for n in names], niche, tone))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def record_hit(kind: str, **fields):
+    """Count a cache hit that speculative work paid for (each entry counts once)."""
+    if not PREFETCH_ENABLED:
+        return
+    state = shared_state.backend()
+    key = _ledger_key(kind, **fields)
+    if await state.get(LEDGER, key) is not None:
+        await state.delete(LEDGER, key)
+        _count(kind, "hit")
+
+
+def usage() -> dict:
+    _budget.wait_time(0)  # refill before reporting
+    return {
+        "budget_per_min": PREFETCH_BUDGET_PER_MIN,
+        "budget_left": round(max(0.0, _budget.tokens), 2),
+        "inflight": _inflight,
+        "top_n": PREFETCH_TOP_N,
+        "logos": PREFETCH_LOGOS,
+        "usage": USAGE,
+    }
+
+
+async def shutdown():
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
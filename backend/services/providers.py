@@ -0,0 +1,185 @@
+import time
+import asyncio
+import random
+import httpx
+from contextlib import asynccontextmanager
+
+from backend.services import metrics, rate_limit
+from backend.services.logs import get_logger
+from backend.services.settings import settings
+
+# Per-provider transport settings: concurrency cap, pool size, timeouts, retry policy
+PROVIDERS = {
+    "openrouter": {
+        "concurrency":     settings.openrouter_max_concurrency,
+        "max_connections": settings.openrouter_pool_size,
+        "connect_timeout": settings.openrouter_connect_timeout,
+        "read_timeout":    settings.openrouter_read_timeout,
+        "max_retries":     settings.openrouter_max_retries,
+        "backoff_base":    0.5,
+        "backoff_max":     8.0,
+    },
+    "huggingface": {
+        "concurrency":     settings.hf_max_concurrency,
+        "max_connections": settings.hf_pool_size,
+        "connect_timeout": settings.hf_connect_timeout,
+        "read_timeout":    settings.hf_read_timeout,
+        "max_retries":     settings.hf_max_retries,
+        "backoff_base":    1.0,
+        "backoff_max":     30.0,
+    },
+    "watson": {
+        "concurrency":     settings.ibm_max_concurrency,
+    },
+}
+
+RETRY_STATUSES = {429, 503}
+
+log = get_logger("providers")
+
+_semaphores: dict = {}
+_clients: dict = {}
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    """Lazily create the per-provider semaphore inside the running loop."""
+    sem = _semaphores.get(provider)
+    if sem is None:
+        sem = asyncio.Semaphore(PROVIDERS[provider]["concurrency"])
+        _semaphores[provider] = sem
+    return sem
+
+
+@asynccontextmanager
+async def _slot(provider: str):
+    """Hold one of the provider's concurrency slots, recording how long we queued for it."""
+    started = time.perf_counter()
+    async with _semaphore(provider):
+        metrics.UPSTREAM_QUEUE_WAIT.observe(time.perf_counter() - started, provider=provider)
+        yield
+
+
+def _new_client(provider: str) -> httpx.AsyncClient:
+    cfg = PROVIDERS[provider]
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(cfg["read_timeout"], connect=cfg["connect_timeout"]),
+        limits=httpx.Limits(
+            max_connections=cfg["max_connections"],
+            max_keepalive_connections=cfg["max_connections"],
+        ),
+    )
+
+
+def _client(provider: str) -> httpx.AsyncClient:
+    """Shared keep-alive client; created on demand if used outside the app lifespan."""
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _new_client(provider)
+        _clients[provider] = client
+    return client
+
+
+async def startup():
+    """Open one pooled client per HTTP provider (called from the FastAPI lifespan)."""
+    for provider, cfg in PROVIDERS.items():
+        if "max_connections" in cfg:
+            _client(provider)
+
+
+async def shutdown():
+    """Close all pooled clients."""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
+
+def _retry_after(response: httpx.Response):
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _retry_delay(provider: str, response: httpx.Response, attempt: int) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After / HF estimated_time hints."""
+    cfg = PROVIDERS[provider]
+    hint = response.headers.get("retry-after")
+    if hint is None:
+        try:
+            hint = response.json().get("estimated_time")
+        except Exception:
+            hint = None
+    try:
+        if hint is not None:
+            return min(float(hint), cfg["backoff_max"])
+    except (TypeError, ValueError):
+        pass
+    return random.uniform(0, min(cfg["backoff_max"], cfg["backoff_base"] * 2 ** attempt))
+
+
+async def post(provider: str, url: str, headers: dict, json: dict, timeout: float = None,
+               model: str = "") -> httpx.Response:
+    """POST to an upstream provider over its pooled client, retrying 429/503 with jittered backoff.
+
+    Every attempt (retries included) takes a provider rate-limit token first, so when the
+    upstream starts throttling, retries are shed with RateLimited instead of piling on.
+    """
+    cfg = PROVIDERS[provider]
+    kwargs = {"timeout": timeout} if timeout is not None else {}
+    attempt = 0
+    while True:
+        await rate_limit.acquire(provider)
+        async with _slot(provider):
+            started = time.perf_counter()
+            try:
+                response = await _client(provider).post(url, headers=headers, json=json, **kwargs)
+            except Exception as e:
+                metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, provider=provider,
+                                                 model=model, status=type(e).__name__)
+                raise
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, provider=provider,
+                                             model=model, status=str(response.status_code))
+        rate_limit.on_upstream_response(provider, response.status_code, _retry_after(response))
+        if response.status_code not in RETRY_STATUSES or attempt >= cfg["max_retries"]:
+            return response
+        delay = _retry_delay(provider, response, attempt)
+        metrics.UPSTREAM_RETRIES.inc(provider=provider, status=str(response.status_code))
+        log.warning("upstream retry", extra={
+            "provider": provider, "model": model, "status": response.status_code,
+            "attempt": attempt + 1, "max_retries": cfg["max_retries"], "delay_s": round(delay, 2),
+        })
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+@asynccontextmanager
+async def stream(provider: str, url: str, headers: dict, json: dict, model: str = ""):
+    """Open a streaming POST on the pooled client; the provider slot is held until the body is closed.
+
+    No retries: a stream cannot be replayed once tokens have been handed to the caller.
+    Latency is recorded to the response headers (time to first byte).
+    """
+    await rate_limit.acquire(provider)
+    async with _slot(provider):
+        started = time.perf_counter()
+        async with _client(provider).stream("POST", url, headers=headers, json=json) as response:
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, provider=provider,
+                                             model=model, status=str(response.status_code))
+            rate_limit.on_upstream_response(provider, response.status_code, _retry_after(response))
+            yield response
+
+
+async def run_blocking(provider: str, fn, *args, **kwargs):
+    """Run a synchronous SDK call in a worker thread so it never stalls the event loop."""
+    await rate_limit.acquire(provider)
+    async with _slot(provider):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, provider=provider,
+                                             model=fn.__name__.lstrip("_"), status=status)
@@ -0,0 +1,208 @@
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from backend.services import metrics
+from backend.services.logs import get_logger
+from backend.services.settings import settings
+
+# Admission control in two layers:
+#   per client   - token bucket keyed by client IP, checked in the HTTP middleware
+#   per provider - adaptive bucket (AIMD on upstream 429s) checked at the edge and
+#                  consumed by providers.post/stream/run_blocking on every upstream call
+# Priorities keep a reserve: "low" work (logos, batches) cannot take a provider's last
+# tokens, so sentiment and chat still get through while logo traffic is being shed.
+RATE_LIMIT_ENABLED = settings.rate_limit_enabled
+CLIENT_RATE = settings.client_rate_per_sec
+CLIENT_BURST = settings.client_burst
+CLIENT_MAX_TRACKED = settings.client_max_tracked
+# Use the first X-Forwarded-For hop as the client address (only behind a trusted proxy)
+TRUST_FORWARDED = settings.rate_limit_trust_forwarded
+# How long an upstream call may wait for a provider token before it is shed
+PROVIDER_MAX_WAIT = settings.provider_max_wait
+
+# rate (tokens/s), burst, min_rate the adaptive limiter may back off to
+PROVIDER_LIMITS = {
+    "openrouter":  (settings.openrouter_rate_per_sec, settings.openrouter_burst, 1.0),
+    "huggingface": (settings.hf_rate_per_sec,         settings.hf_burst,         0.1),
+    "watson":      (settings.ibm_rate_per_sec,        settings.ibm_burst,        0.5),
+}
+
+# Fraction of a bucket each priority must leave untouched; "speculative" (prefetch)
+# only ever spends capacity nobody else is using
+PRIORITY_RESERVE = {"high": 0.0, "normal": 0.2, "low": 0.5, "speculative": 0.8}
+
+# POST path prefix -> (priority, client token cost, provider it will hit or None)
+ROUTE_CLASSES = [
+    ("/api/batch/",     "low",    5, None),
+    ("/api/logo",       "low",    5, "huggingface"),
+    ("/api/sentiment",  "high",   1, None),
+    ("/api/assistant",  "high",   1, "openrouter"),
+    ("/api/brand-name", "normal", 2, "openrouter"),
+    ("/api/content",    "normal", 2, "openrouter"),
+]
+
+# Set per request by the middleware; background work (logo job workers) sets "low"
+priority: ContextVar = ContextVar("priority", default="normal")
+
+log = get_logger("rate_limit")
+
+
+class RateLimited(Exception):
+    """Over capacity; the caller should retry after retry_after seconds."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded ({scope}), retry after {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float = 1.0, reserve: float = 0.0) -> float:
+        """Seconds until cost tokens can be taken while leaving reserve*burst behind (0 = now)."""
+        self._refill(time.monotonic())
+        missing = cost + reserve * self.burst - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def try_take(self, cost: float = 1.0, reserve: float = 0.0) -> float:
+        """Take cost tokens if possible and return 0, else return the wait time."""
+        wait = self.wait_time(cost, reserve)
+        if wait == 0:
+            self.tokens -= cost
+        return wait
+
+
+class AdaptiveBucket(TokenBucket):
+    """Token bucket whose rate halves on upstream 429 and creeps back up on success."""
+
+    def __init__(self, name: str, rate: float, burst: float, min_rate: float):
+        super().__init__(rate, burst)
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self._last_decrease = 0.0
+
+    def on_throttled(self, retry_after: float = None):
+        now = time.monotonic()
+        self._refill(now)
+        # Stop admitting until the upstream's hint has passed (or one token's worth)
+        self.tokens = min(self.tokens, -(retry_after or 0) * self.rate)
+        # In-flight requests all see the same 429 burst; count it once per second
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        old, self.rate = self.rate, max(self.min_rate, self.rate / 2)
+        log.warning("provider rate decreased", extra={
+            "provider": self.name, "from": round(old, 3), "to": round(self.rate, 3),
+        })
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.02)
+
+
+_clients: OrderedDict = OrderedDict()
+_providers = {name: AdaptiveBucket(name, *limits) for name, limits in PROVIDER_LIMITS.items()}
+
+
+def client_id(request) -> str:
+    """The client address. Not a caller-chosen header: the app has no API keys to check
+    one against, so keying on it would hand out a fresh burst per made-up value."""
+    if TRUST_FORWARDED and request.headers.get("x-forwarded-for"):
+        return "ip:" + request.headers["x-forwarded-for"].split(",")[0].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _client_bucket(client: str) -> TokenBucket:
+    bucket = _clients.get(client)
+    if bucket is None:
+        bucket = _clients[client] = TokenBucket(CLIENT_RATE, CLIENT_BURST)
+        if len(_clients) > CLIENT_MAX_TRACKED:
+            _clients.popitem(last=False)
+    else:
+        _clients.move_to_end(client)
+    return bucket
+
+
+def classify(method: str, path: str):
+    """(priority, cost, provider) for requests that are admission-controlled, else None."""
+    if method != "POST":
+        return None
+    for prefix, level, cost, provider in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return level, cost, provider
+    return None
+
+
+def admit(client: str, method: str, path: str) -> str:
+    """Admit or shed a request at the edge. Returns its priority, raises RateLimited.
+
+    The provider check only peeks (cached answers need no upstream token); the client
+    bucket is charged only once the provider check has passed.
+    """
+    route = classify(method, path)
+    if route is None or not RATE_LIMIT_ENABLED:
+        return "normal"
+    level, cost, provider = route
+    if provider is not None:
+        wait = _providers[provider].wait_time(1, PRIORITY_RESERVE[level])
+        if wait > PROVIDER_MAX_WAIT:
+            metrics.RATE_LIMITED.inc(scope=provider, priority=level)
+            raise RateLimited(f"provider:{provider}", wait)
+    wait = _client_bucket(client).try_take(cost)
+    if wait:
+        metrics.RATE_LIMITED.inc(scope="client", priority=level)
+        raise RateLimited("client", wait)
+    return level
+
+
+def idle(provider: str, level: str = "speculative") -> bool:
+    """True if a call at this priority could take a provider token right now."""
+    if not RATE_LIMIT_ENABLED:
+        return True
+    return _providers[provider].wait_time(1, PRIORITY_RESERVE[level]) == 0
+
+
+async def acquire(provider: str):
+    """Take one provider token for an upstream call, waiting up to PROVIDER_MAX_WAIT."""
+    if not RATE_LIMIT_ENABLED:
+        return
+    level = priority.get()
+    bucket = _providers[provider]
+    deadline = time.monotonic() + PROVIDER_MAX_WAIT
+    while True:
+        wait = bucket.try_take(1, PRIORITY_RESERVE.get(level, 0.0))
+        if not wait:
+            return
+        if time.monotonic() + wait > deadline:
+            metrics.RATE_LIMITED.inc(scope=provider, priority=level)
+            raise RateLimited(f"provider:{provider}", wait)
+        await asyncio.sleep(wait)
+
+
+def on_upstream_response(provider: str, status: int, retry_after: float = None):
+    """Feed upstream outcomes back into the provider's adaptive rate."""
+    bucket = _providers.get(provider)
+    if bucket is None:
+        return
+    if status == 429:
+        bucket.on_throttled(retry_after)
+    elif status < 400:
+        bucket.on_success()
+
@@ -0,0 +1,81 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+# Response shapes we ask the LLM for. Validated before anything is cached or returned,
+# so a malformed reply is repaired (or rejected) instead of reaching the frontend.
+
+
+class BrandName(BaseModel):
+    name: str
+    tagline: str = ""
+    meaning: str = ""
+    style: str = ""
+
+
+class BrandNamesResponse(BaseModel):
+    names: List[BrandName] = Field(min_length=1)
+
+
+class Tagline(BaseModel):
+    text: str
+    use_case: str = ""
+
+
+class TaglinesResponse(BaseModel):
+    taglines: List[Tagline] = Field(min_length=1)
+
+
+class Bios(BaseModel):
+    short: str
+    medium: str
+    long: str
+
+
+class BiosResponse(BaseModel):
+    bios: Bios
+
+
+class Ad(BaseModel):
+    platform: str = ""
+    headline: str
+    body: str
+    cta: str = ""
+
+
+class AdsResponse(BaseModel):
+    ads: List[Ad] = Field(min_length=1)
+
+
+class EmailResponse(BaseModel):
+    subject: str
+    preview: str = ""
+    body: str
+    sign_off: str = ""
+
+
+class SocialPost(BaseModel):
+    platform: str = ""
+    content: str
+    hashtags: List[str] = []
+
+
+class SocialResponse(BaseModel):
+    posts: List[SocialPost] = Field(min_length=1)
+
+
+CONTENT_SCHEMAS = {
+    "tagline": TaglinesResponse,
+    "bio": BiosResponse,
+    "ad_copy": AdsResponse,
+    "email": EmailResponse,
+    "social": SocialResponse,
+}
+
+
+class BrandKitResponse(BaseModel):
+    """CONTENT_KIT_MODE=combined: every section in one reply, keyed by content type."""
+    tagline: TaglinesResponse
+    bio: BiosResponse
+    ad_copy: AdsResponse
+    email: EmailResponse
+    social: SocialResponse
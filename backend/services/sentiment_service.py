@@ -0,0 +1,77 @@
+
+from backend.services import ibm_service, local_sentiment
+from backend.services.cache import TieredCache, make_key
+from backend.services.settings import settings
+
+# "local" (offline lexicon engine) or "watson" (IBM NLU, falls back to local on failure)
+SENTIMENT_BACKEND = settings.sentiment_backend
+
+BACKENDS = ("local", "watson")
+
+# Watson needs ~100 chars to detect language reliably; shorter texts go to the local engine
+WATSON_MIN_CHARS = settings.watson_min_chars
+
+SENTIMENT_CACHE_SIZE = settings.sentiment_cache_size
+SENTIMENT_CACHE_TTL = settings.sentiment_cache_ttl
+# Local results are cheaper to recompute than to fetch; share only if Watson is the default
+SENTIMENT_CACHE_SHARED = settings.sentiment_cache_shared
+
+sentiment_cache = TieredCache(SENTIMENT_CACHE_SIZE, SENTIMENT_CACHE_TTL, table="sentiment_cache",
+                              shared=SENTIMENT_CACHE_SHARED)
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def resolve_backend(backend: str = None) -> str:
+    backend = (backend or SENTIMENT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+    return backend
+
+
+def _route(text: str, backend: str) -> tuple:
+    """Pick the backend that will actually run, and why."""
+    if backend == "watson" and len(text.strip()) < WATSON_MIN_CHARS:
+        return "local", "short_text"
+    return backend, "requested"
+
+
+async def analyze(text: str, backend: str = None, use_cache: bool = True) -> dict:
+    """Run the requested (or configured) sentiment backend behind the result cache."""
+    requested = resolve_backend(backend)
+    effective, reason = _route(text, requested)
+    key = make_key(effective, text.casefold())
+
+    if use_cache:
+        cached = await sentiment_cache.get(key)
+        if cached is not None:
+            cache_stats["hits"] += 1
+            return {**cached, "cache": "hit", "requested_backend": requested, "routing": reason}
+        cache_stats["misses"] += 1
+
+    if effective == "watson":
+        result = await ibm_service.analyze_sentiment(text)
+    else:
+        result = ibm_service.local_analysis(text)
+
+    # Fallback results are not cached so Watson is retried once it recovers
+    if not result.get("fallback"):
+        await sentiment_cache.set(key, result)
+    return {**result, "cache": "miss" if use_cache else "bypass", "requested_backend": requested, "routing": reason}
+
+
+def analyze_local_batch(texts: list) -> list:
+    """Score many texts with the local engine in one synchronous call (no per-item tasks)."""
+    return [
+        {**ibm_service.local_analysis(text, scores=scores), "cache": "bypass",
+         "requested_backend": "local", "routing": "requested"}
+        for text, scores in zip(texts, local_sentiment.score_batch(texts))
+    ]
+
+
+def cache_status() -> dict:
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return {
+        **cache_stats,
+        "hit_rate": round(cache_stats["hits"] / lookups, 3) if lookups else None,
+        "entries": len(sentiment_cache.memory),
+    }
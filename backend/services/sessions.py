@@ -0,0 +1,93 @@
+import time
+import uuid
+import asyncio
+
+from backend.services import shared_state
+from backend.services.settings import settings
+from backend.services.gemini_service import summarize_conversation
+from backend.services.logs import get_logger
+
+SESSION_TTL = settings.session_ttl
+
+# Once summary + turns exceed this many (estimated) tokens, older turns are folded into the summary
+SESSION_TOKEN_BUDGET = settings.session_token_budget
+SESSION_KEEP_TURNS = settings.session_keep_turns
+
+# Sessions change on every turn, so they are read from the shared backend each time
+# (no per-process copy that another worker could leave stale)
+SESSIONS = "assistant_sessions"
+
+_compactions: set = set()
+# One compaction per session across all workers. Past the TTL a second may start, which is
+# still safe: _fold only writes if the session still holds the turns it summarised.
+COMPACT_LOCK = "lock:session_compaction"
+COMPACT_LOCK_TTL = 300.0
+
+log = get_logger("sessions")
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting English chat
+    return len(text) // 4 + 1
+
+
+def _session_tokens(session: dict) -> int:
+    return _estimate_tokens(session["summary"]) + sum(_estimate_tokens(t["content"]) for t in session["turns"])
+
+
+async def get_or_create(session_id: str = None, seed: list = None) -> dict:
+    """Load a session, or start one (optionally seeded with client-sent history)."""
+    if session_id:
+        session = await shared_state.backend().get(SESSIONS, session_id)
+        if session is not None:
+            return session
+    return {
+        "id": session_id or uuid.uuid4().hex,
+        "summary": "",
+        "turns": list(seed or []),
+        "updated_at": time.time(),
+    }
+
+
+async def record_turn(session: dict, user_message: str, reply: str):
+    """Append a user/assistant exchange, persist it, and compact in the background if over budget."""
+    session["turns"].append({"role": "user", "content": user_message})
+    session["turns"].append({"role": "assistant", "content": reply})
+    session["updated_at"] = time.time()
+    await shared_state.backend().set(SESSIONS, session["id"], session, SESSION_TTL)
+    if _session_tokens(session) > SESSION_TOKEN_BUDGET and len(session["turns"]) > SESSION_KEEP_TURNS:
+        task = asyncio.create_task(_compact(session))
+        _compactions.add(task)
+        task.add_done_callback(_compactions.discard)
+
+
+async def _compact(session: dict):
+    """Fold all but the most recent turns into the running summary."""
+    state, token = shared_state.backend(), uuid.uuid4().hex
+    if not await state.add(COMPACT_LOCK, session["id"], token, COMPACT_LOCK_TTL):
+        return  # already being compacted (here or in another worker)
+    try:
+        await _fold(session)
+    finally:
+        await state.delete(COMPACT_LOCK, session["id"], only_if=token)
+
+
+async def _fold(session: dict):
+    base, old = session["summary"], list(session["turns"][:-SESSION_KEEP_TURNS])
+    try:
+        summary = await summarize_conversation(session["summary"], old)
+    except Exception as e:
+        # Keep the turns: the session is still over budget, so the next turn retries
+        log.warning("summarization failed", extra={"session_id": session["id"], "error": str(e) or type(e).__name__})
+        return
+
+    # Re-read so turns recorded while we were summarising are kept, and drop exactly
+    # the turns that were summarised; if another worker compacted meanwhile, keep its result
+    current = await shared_state.backend().get(SESSIONS, session["id"]) or session
+    if current["summary"] != base or current["turns"][:len(old)] != old:
+        log.info("session changed during compaction, skipped", extra={"session_id": session["id"]})
+        return
+    current["summary"] = summary
+    current["turns"] = current["turns"][len(old):]
+    await shared_state.backend().set(SESSIONS, current["id"], current, SESSION_TTL)
+    log.info("session compacted", extra={"session_id": session["id"], "turns": len(old)})
@@ -0,0 +1,217 @@
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+# Every environment variable the app reads, parsed once into a typed, immutable object.
+# Modules import `settings` and copy what they need into their module-level constants,
+# so .env is read exactly once per process instead of once per service import.
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+_FALSE = ("0", "false", "no", "off")
+
+
+def _str(name: str, default: str = "") -> str:
+    return os.getenv(name, default).strip()
+
+
+def _secret(name: str) -> str:
+    # Keys pasted with quotes into .env are a common mistake
+    return os.getenv(name, "").strip().strip("'\"").strip()
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.strip().lower() not in _FALSE
+
+
+def _list(name: str, default: str) -> tuple:
+    return tuple(item.strip() for item in os.getenv(name, default).split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class Settings:
+    # ── Providers ──
+    openrouter_api_key: str
+    openrouter_url: str
+    hf_token: str
+    hf_api_base: str
+    ibm_api_key: str
+    ibm_url: str
+    ibm_iam_url: str
+
+    openrouter_max_concurrency: int
+    openrouter_pool_size: int
+    openrouter_connect_timeout: float
+    openrouter_read_timeout: float
+    openrouter_max_retries: int
+    hf_max_concurrency: int
+    hf_pool_size: int
+    hf_connect_timeout: float
+    hf_read_timeout: float
+    hf_max_retries: int
+    ibm_max_concurrency: int
+
+    ibm_breaker_threshold: int
+    ibm_breaker_reset: float
+    ibm_probe_interval: float
+
+    # ── Rate limiting ──
+    rate_limit_enabled: bool
+    client_rate_per_sec: float
+    client_burst: float
+    client_max_tracked: int
+    rate_limit_trust_forwarded: bool
+    provider_max_wait: float
+    openrouter_rate_per_sec: float
+    openrouter_burst: float
+    hf_rate_per_sec: float
+    hf_burst: float
+    ibm_rate_per_sec: float
+    ibm_burst: float
+
+    # ── Shared state, caches and sessions ──
+    state_backend: str
+    state_db: str
+    redis_url: str
+    response_cache_size: int
+    response_cache_ttl: float
+    sentiment_cache_size: int
+    sentiment_cache_ttl: float
+    sentiment_cache_shared: bool
+    session_ttl: float
+    session_token_budget: int
+    session_keep_turns: int
+
+    # ── Features ──
+    content_kit_mode: str
+    sentiment_backend: str
+    watson_min_chars: int
+    logo_postprocess: bool
+    logo_dispatch: str
+    logo_hedge_delay: float
+    logo_model_cooldown: float
+    logo_model_max_failures: int
+    logo_workers: int
+    logo_queue_size: int
+    logo_job_ttl: float
+    logo_job_stale_after: float
+    logo_job_max_retries: int
+    logo_variant_formats: tuple
+    logo_preview_size: int
+    image_process_workers: int
+    image_store_dir: str
+    batch_max_items: int
+    batch_concurrency: int
+    batch_rate_per_sec: float
+    static_pipeline: bool
+
+    # ── Speculative prefetch ──
+    prefetch_enabled: bool
+    prefetch_top_n: int
+    prefetch_logos: bool
+    prefetch_budget_per_min: float
+    prefetch_max_inflight: int
+    # Required (X-Admin-Token) for operator endpoints; unset disables them
+    admin_token: str
+
+    # ── Runtime ──
+    log_level: str
+    warmup_timeout: float
+
+
+def load() -> Settings:
+    # Real environment variables win over .env, so deploy and benchmark env is never shadowed
+    load_dotenv(override=False)
+    return Settings(
+        openrouter_api_key=_secret("OPENROUTER_API_KEY"),
+        openrouter_url=_str("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions"),
+        hf_token=_secret("HF_TOKEN"),
+        hf_api_base=_str("HF_API_BASE", "https://router.huggingface.co/hf-inference/models").rstrip("/"),
+        ibm_api_key=_secret("IBM_API_KEY"),
+        ibm_url=_secret("IBM_URL"),
+        ibm_iam_url=_str("IBM_IAM_URL"),
+
+        openrouter_max_concurrency=_int("OPENROUTER_MAX_CONCURRENCY", 64),
+        openrouter_pool_size=_int("OPENROUTER_POOL_SIZE", 32),
+        openrouter_connect_timeout=_float("OPENROUTER_CONNECT_TIMEOUT", 5),
+        openrouter_read_timeout=_float("OPENROUTER_READ_TIMEOUT", 60),
+        openrouter_max_retries=_int("OPENROUTER_MAX_RETRIES", 2),
+        hf_max_concurrency=_int("HF_MAX_CONCURRENCY", 8),
+        hf_pool_size=_int("HF_POOL_SIZE", 8),
+        hf_connect_timeout=_float("HF_CONNECT_TIMEOUT", 5),
+        hf_read_timeout=_float("HF_READ_TIMEOUT", 90),
+        hf_max_retries=_int("HF_MAX_RETRIES", 1),
+        ibm_max_concurrency=_int("IBM_MAX_CONCURRENCY", 16),
+
+        ibm_breaker_threshold=_int("IBM_BREAKER_THRESHOLD", 3),
+        ibm_breaker_reset=_float("IBM_BREAKER_RESET", 30),
+        ibm_probe_interval=_float("IBM_PROBE_INTERVAL", 60),
+
+        rate_limit_enabled=_bool("RATE_LIMIT_ENABLED", True),
+        client_rate_per_sec=_float("CLIENT_RATE_PER_SEC", 2),
+        client_burst=_float("CLIENT_BURST", 20),
+        client_max_tracked=_int("CLIENT_MAX_TRACKED", 10000),
+        rate_limit_trust_forwarded=_bool("RATE_LIMIT_TRUST_FORWARDED", False),
+        provider_max_wait=_float("PROVIDER_MAX_WAIT", 2),
+        openrouter_rate_per_sec=_float("OPENROUTER_RATE_PER_SEC", 20),
+        openrouter_burst=_float("OPENROUTER_BURST", 40),
+        hf_rate_per_sec=_float("HF_RATE_PER_SEC", 1),
+        hf_burst=_float("HF_BURST", 6),
+        ibm_rate_per_sec=_float("IBM_RATE_PER_SEC", 10),
+        ibm_burst=_float("IBM_BURST", 20),
+
+        state_backend=_str("STATE_BACKEND", "sqlite").lower(),
+        state_db=_str("STATE_DB") or os.path.join(_ROOT, ".state", "brandcraft.db"),
+        redis_url=_str("REDIS_URL", "redis://localhost:6379/0"),
+        response_cache_size=_int("RESPONSE_CACHE_SIZE", 512),
+        response_cache_ttl=_float("RESPONSE_CACHE_TTL", 86400),
+        sentiment_cache_size=_int("SENTIMENT_CACHE_SIZE", 4096),
+        sentiment_cache_ttl=_float("SENTIMENT_CACHE_TTL", 86400),
+        sentiment_cache_shared=_bool("SENTIMENT_CACHE_SHARED", False),
+        session_ttl=_float("SESSION_TTL", 86400),
+        session_token_budget=_int("SESSION_TOKEN_BUDGET", 1500),
+        session_keep_turns=_int("SESSION_KEEP_TURNS", 6),
+
+        content_kit_mode=_str("CONTENT_KIT_MODE", "parallel").lower(),
+        sentiment_backend=_str("SENTIMENT_BACKEND", "local").lower(),
+        watson_min_chars=_int("WATSON_MIN_CHARS", 100),
+        logo_postprocess=_bool("LOGO_POSTPROCESS", True),
+        logo_dispatch=_str("LOGO_DISPATCH", "sequential").lower(),
+        logo_hedge_delay=_float("LOGO_HEDGE_DELAY", 20),
+        logo_model_cooldown=_float("LOGO_MODEL_COOLDOWN", 120),
+        logo_model_max_failures=_int("LOGO_MODEL_MAX_FAILURES", 2),
+        logo_workers=_int("LOGO_WORKERS", 2),
+        logo_queue_size=_int("LOGO_QUEUE_SIZE", 100),
+        logo_job_ttl=_float("LOGO_JOB_TTL", 3600),
+        logo_job_stale_after=_float("LOGO_JOB_STALE_AFTER", 60),
+        logo_job_max_retries=_int("LOGO_JOB_MAX_RETRIES", 10),
+        logo_variant_formats=_list("LOGO_VARIANT_FORMATS", "webp,png"),
+        logo_preview_size=_int("LOGO_PREVIEW_SIZE", 512),
+        image_process_workers=_int("IMAGE_PROCESS_WORKERS", 2),
+        image_store_dir=_str("IMAGE_STORE_DIR") or os.path.join(_ROOT, "generated_images"),
+        batch_max_items=_int("BATCH_MAX_ITEMS", 100),
+        batch_concurrency=_int("BATCH_CONCURRENCY", 8),
+        batch_rate_per_sec=_float("BATCH_RATE_PER_SEC", 0),
+        static_pipeline=_bool("STATIC_PIPELINE", True),
+
+        prefetch_enabled=_bool("PREFETCH_ENABLED", False),
+        prefetch_top_n=_int("PREFETCH_TOP_N", 2),
+        prefetch_logos=_bool("PREFETCH_LOGOS", True),
+        prefetch_budget_per_min=_float("PREFETCH_BUDGET_PER_MIN", 12),
+        prefetch_max_inflight=_int("PREFETCH_MAX_INFLIGHT", 4),
+        admin_token=_secret("ADMIN_TOKEN"),
+
+        log_level=_str("LOG_LEVEL", "INFO").upper(),
+        warmup_timeout=_float("WARMUP_TIMEOUT", 20),
+    )
+
+
+settings = load()
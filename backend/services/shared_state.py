@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+
+from backend.services.logs import get_logger
+from backend.services.rate_limit import RateLimited
+from backend.services.settings import settings
+
+# State shared by every uvicorn worker: LLM response cache, assistant sessions, logo jobs.
+#   STATE_BACKEND=sqlite  (default) one WAL-mode SQLite file; all workers on a node share it
+#   STATE_BACKEND=redis   any Redis-compatible server at REDIS_URL (pip install redis)
+#   STATE_BACKEND=memory  per-process dicts; only correct with a single worker
+# Values are JSON. Keys live in a namespace so one backend serves every store.
+
+log = get_logger("shared_state")
+
+LOCK_TTL = 30.0           # a computing worker that dies releases its key after this long;
+LOCK_RENEW = LOCK_TTL / 3  # a live one renews it this often, however long compute() takes
+POLL_INITIAL = 0.05       # waiting workers poll for the winner's result with backoff
+POLL_MAX = 0.5
+
+
+class StateBackend:
+    """Storage interface. Subclasses implement get/set/add/delete; get_or_compute builds on them."""
+
+    name = "base"
+
+    def __init__(self):
+        self._inflight: dict = {}
+
+    async def get(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    async def set(self, namespace: str, key: str, value, ttl: float):
+        raise NotImplementedError
+
+    async def add(self, namespace: str, key: str, value, ttl: float) -> bool:
+        """Set only if the key is absent (or expired). True if this call stored the value."""
+        raise NotImplementedError
+
+    async def delete(self, namespace: str, key: str, only_if=None):
+        """Delete the key; with only_if, only while it still holds that value."""
+        raise NotImplementedError
+
+    async def extend(self, namespace: str, key: str, value, ttl: float) -> bool:
+        """Reset the key's TTL while it still holds value. False if it expired or changed hands."""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def get_or_compute(self, namespace: str, key: str, compute, ttl: float) -> tuple:
+        """Return (value, hit). On a miss exactly one caller across all workers runs compute().
+
+        Within a process, concurrent callers share one future; across processes the first
+        worker to add() a lock key computes while the others poll for its result.
+        """
+        value = await self.get(namespace, key)
+        if value is not None:
+            return value, True
+
+        slot = f"{namespace}:{key}"
+        while (pending := self._inflight.get(slot)) is not None:
+            try:
+                return await asyncio.shield(pending), True
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled, not the one computing
+                # The computing request was cancelled (client went away); take over
+            except RateLimited:
+                # The computing caller was shed at its own priority (e.g. speculative
+                # prefetch); this caller may still be admitted at its own, so retry
+                pass
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[slot] = future
+        try:
+            result = await self._compute_once(namespace, key, compute, ttl)
+            future.set_result(result[0])
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no one else was waiting
+            raise
+        finally:
+            del self._inflight[slot]
+
+    async def _compute_once(self, namespace: str, key: str, compute, ttl: float) -> tuple:
+        lock_ns, token = f"lock:{namespace}", uuid.uuid4().hex
+        delay = POLL_INITIAL
+        while True:
+            if await self.add(lock_ns, key, token, LOCK_TTL):
+                renewer = asyncio.create_task(self._renew(lock_ns, key, token))
+                try:
+                    value = await self.get(namespace, key)
+                    if value is not None:
+                        return value, True
+                    value = await compute()
+                    await self.set(namespace, key, value, ttl)
+                    return value, False
+                finally:
+                    renewer.cancel()
+                    await self.delete(lock_ns, key, only_if=token)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX)
+            value = await self.get(namespace, key)
+            if value is not None:
+                return value, True
+
+    async def _renew(self, lock_ns: str, key: str, token: str):
+        """Keep a lock alive while its holder computes (slow logos, LLM retries plus repair)."""
+        while True:
+            await asyncio.sleep(LOCK_RENEW)
+            try:
+                if not await self.extend(lock_ns, key, token, LOCK_TTL):
+                    log.warning("lost compute lock", extra={"namespace": lock_ns, "key": key})
+                    return
+            except Exception as e:
+                log.warning("lock renewal failed", extra={"namespace": lock_ns, "error": str(e)})
+
+
+class MemoryBackend(StateBackend):
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._data: dict = {}
+
+    def _live(self, slot):
+        item = self._data.get(slot)
+        if item is not None and item[0] < time.time():
+            del self._data[slot]
+            return None
+        return item
+
+    async def get(self, namespace, key):
+        item = self._live((namespace, key))
+        return None if item is None else item[1]
+
+    async def set(self, namespace, key, value, ttl):
+        self._data[(namespace, key)] = (time.time() + ttl, value)
+
+    async def add(self, namespace, key, value, ttl):
+        if self._live((namespace, key)) is not None:
+            return False
+        await self.set(namespace, key, value, ttl)
+        return True
+
+    async def delete(self, namespace, key, only_if=None):
+        item = self._live((namespace, key))
+        if item is not None and (only_if is None or item[1] == only_if):
+            del self._data[(namespace, key)]
+
+    async def extend(self, namespace, key, value, ttl):
+        item = self._live((namespace, key))
+        if item is None or item[1] != value:
+            return False
+        await self.set(namespace, key, value, ttl)
+        return True
+
+
+class SQLiteBackend(StateBackend):
+    """One table in a WAL-mode SQLite file; readers never block the single writer."""
+
+    name = "sqlite"
+    SWEEP_EVERY = 500
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_state ("
+            "ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (ns, key))"
+        )
+
+    def _get(self, namespace, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared_state WHERE ns = ? AND key = ? AND expires_at >= ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _write(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            changed = self._conn.execute(sql, params).rowcount
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._conn.execute("DELETE FROM shared_state WHERE expires_at < ?", (time.time(),))
+        return changed
+
+    def _set(self, namespace, key, value, ttl):
+        self._write(
+            "INSERT OR REPLACE INTO shared_state (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), time.time() + ttl),
+        )
+
+    def _add(self, namespace, key, value, ttl) -> bool:
+        # Single statement, so atomic across processes: insert, or take over an expired row
+        now = time.time()
+        return self._write(
+            "INSERT INTO shared_state (ns, key, value, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE shared_state.expires_at < ?",
+            (namespace, key, json.dumps(value), now + ttl, now),
+        ) == 1
+
+    def _delete(self, namespace, key, only_if=None):
+        if only_if is None:
+            self._write("DELETE FROM shared_state WHERE ns = ? AND key = ?", (namespace, key))
+        else:
+            self._write("DELETE FROM shared_state WHERE ns = ? AND key = ? AND value = ?",
+                        (namespace, key, json.dumps(only_if)))
+
+    def _extend(self, namespace, key, value, ttl) -> bool:
+        now = time.time()
+        return self._write(
+            "UPDATE shared_state SET expires_at = ? WHERE ns = ? AND key = ? AND value = ? AND expires_at >= ?",
+            (now + ttl, namespace, key, json.dumps(value), now),
+        ) == 1
+
+    async def get(self, namespace, key):
+        return await asyncio.to_thread(self._get, namespace, key)
+
+    async def set(self, namespace, key, value, ttl):
+        await asyncio.to_thread(self._set, namespace, key, value, ttl)
+
+    async def add(self, namespace, key, value, ttl):
+        return await asyncio.to_thread(self._add, namespace, key, value, ttl)
+
+    async def delete(self, namespace, key, only_if=None):
+        await asyncio.to_thread(self._delete, namespace, key, only_if)
+
+    async def extend(self, namespace, key, value, ttl):
+        return await asyncio.to_thread(self._extend, namespace, key, value, ttl)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(StateBackend):
+    """Redis (or Valkey/KeyDB/...) via redis.asyncio; shares state across nodes, not just workers."""
+
+    name = "redis"
+    _DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+    _EXTEND_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("STATE_BACKEND=redis needs the redis package: pip install redis") from e
+        self._redis = redis.from_url(url)
+
+    @staticmethod
+    def _key(namespace, key) -> str:
+        return f"brandcraft:{namespace}:{key}"
+
+    async def get(self, namespace, key):
+        raw = await self._redis.get(self._key(namespace, key))
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, namespace, key, value, ttl):
+        await self._redis.set(self._key(namespace, key), json.dumps(value), px=int(ttl * 1000))
+
+    async def add(self, namespace, key, value, ttl):
+        return bool(await self._redis.set(self._key(namespace, key), json.dumps(value), px=int(ttl * 1000), nx=True))
+
+    async def delete(self, namespace, key, only_if=None):
+        if only_if is None:
+            await self._redis.delete(self._key(namespace, key))
+        else:
+            await self._redis.eval(self._DELETE_IF, 1, self._key(namespace, key), json.dumps(only_if))
+
+    async def extend(self, namespace, key, value, ttl):
+        return bool(await self._redis.eval(self._EXTEND_IF, 1, self._key(namespace, key),
+                                           json.dumps(value), int(ttl * 1000)))
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+_backend = None
+
+
+def backend() -> StateBackend:
+    """The process-wide backend, created on first use from settings."""
+    global _backend
+    if _backend is None:
+        kind = settings.state_backend
+        if kind == "redis":
+            _backend = RedisBackend(settings.redis_url)
+        elif kind == "memory":
+            _backend = MemoryBackend()
+        elif kind == "sqlite":
+            _backend = SQLiteBackend(settings.state_db)
+        else:
+            raise ValueError(f"Unknown STATE_BACKEND '{kind}'. Use sqlite, redis or memory")
+        log.info("shared state backend", extra={"backend": _backend.name})
+    return _backend
+
+
+async def close():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
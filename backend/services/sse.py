@@ -0,0 +1,11 @@
+import json
+
+# Server-sent events framing shared by the streaming routes (assistant, brand names, logo jobs).
+
+# No caching, and no proxy buffering (nginx/Render) so each event reaches the client immediately
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def event(name: str, data: dict) -> str:
+    """One SSE frame: a named event with a JSON payload."""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
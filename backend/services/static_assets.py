@@ -0,0 +1,135 @@
+import os
+import re
+import gzip
+import hashlib
+
+from backend.services.logs import get_logger
+from backend.services.settings import settings
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+# Build-at-startup pipeline for frontend/index.html: the inline <style> and <script>
+# blocks are split out, minified and fingerprinted (app.<hash>.css / app.<hash>.js),
+# and every asset is precompressed once so requests only pick a variant.
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "frontend"))
+STATIC_PIPELINE = settings.static_pipeline
+MIN_COMPRESS_BYTES = 1024
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+log = get_logger("static")
+
+_STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+_SCRIPT_RE = re.compile(r"<script>(.*?)</script>", re.S)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*")
+
+# url path -> {"media_type", "etag", "cache_control", "body": {encoding: bytes}}
+# Replaced as a whole by build(), so readers never see a half-built table; empty until then
+ASSETS: dict = {}
+
+
+# ── Minifiers ───────────────────────────────────────────────────
+# Deliberately conservative: no parser, so only transformations that cannot change
+# meaning. JS keeps its line breaks (ASI) and comments (they may sit inside strings).
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = _CSS_PUNCT.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def _strip_lines(text: str) -> str:
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def minify_js(js: str) -> str:
+    return "\n".join(line for line in _strip_lines(js).splitlines() if not line.startswith("//"))
+
+
+def minify_html(html: str) -> str:
+    return _strip_lines(html)
+
+
+# ── Build ───────────────────────────────────────────────────────
+def _fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _add(assets: dict, path: str, data: bytes, media_type: str, immutable: bool):
+    body = {"identity": data}
+    if len(data) >= MIN_COMPRESS_BYTES:
+        body["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            body["br"] = brotli.compress(data, quality=11)
+    assets[path] = {
+        "media_type": media_type,
+        "etag": f'"{_fingerprint(data)}"',
+        "cache_control": IMMUTABLE if immutable else REVALIDATE,
+        "body": body,
+    }
+
+
+def build(frontend_dir: str = FRONTEND_DIR) -> dict:
+    """Rebuild ASSETS from index.html. Returns {path: {encoding: size}} for logging."""
+    global ASSETS
+    with open(os.path.join(frontend_dir, "index.html"), encoding="utf-8") as f:
+        html = f.read()
+    assets = {}
+
+    if STATIC_PIPELINE:
+        css = "\n".join(_STYLE_RE.findall(html))
+        js = "\n".join(_SCRIPT_RE.findall(html))
+        css_bytes = minify_css(css).encode()
+        js_bytes = minify_js(js).encode()
+        css_path = f"/static/app.{_fingerprint(css_bytes)}.css"
+        js_path = f"/static/app.{_fingerprint(js_bytes)}.js"
+        _add(assets, css_path, css_bytes, "text/css; charset=utf-8", immutable=True)
+        _add(assets, js_path, js_bytes, "application/javascript; charset=utf-8", immutable=True)
+
+        # Every inline block is removed; one <link>/<script src> carries the combined asset
+        html = _STYLE_RE.sub(lambda m: "", html)
+        html = html.replace("</head>", f'<link rel="stylesheet" href="{css_path}">\n</head>', 1)
+        html = _SCRIPT_RE.sub(lambda m: "", html)
+        html = html.replace("</body>", f'<script src="{js_path}"></script>\n</body>', 1)
+        html = minify_html(html)
+
+    _add(assets, "/", html.encode(), "text/html; charset=utf-8", immutable=False)
+    ASSETS = assets
+    sizes = {path: {enc: len(data) for enc, data in asset["body"].items()} for path, asset in assets.items()}
+    log.info("static assets built", extra={"assets": sizes, "brotli": brotli is not None})
+    return sizes
+
+
+# ── Serving ─────────────────────────────────────────────────────
+def _accepted(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    return accepted
+
+
+def negotiate(asset: dict, accept_encoding: str) -> str:
+    """Smallest precompressed variant the client accepts, else identity."""
+    accepted = _accepted(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in asset["body"] and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def is_built() -> bool:
+    return bool(ASSETS)
+
+
+def lookup(path: str):
+    """The built asset for path, or None (also before the warm-up build has finished)."""
+    return ASSETS.get(path)
@@ -0,0 +1,73 @@
+import time
+import asyncio
+
+from backend.services.logs import get_logger
+from backend.services.settings import settings
+
+# Background warm-up run from the FastAPI lifespan. /health answers as soon as the
+# process is up (liveness); /ready only turns 200 once every step below has finished
+# or WARMUP_TIMEOUT has passed, so a scaled-from-zero instance gets traffic with hot
+# clients instead of paying SDK imports and token exchanges on the first requests.
+
+log = get_logger("warmup")
+
+STARTUP = {
+    "import_s": None,     # module imports in backend/main.py
+    "lifespan_s": None,   # lifespan startup before the app starts accepting connections
+    "ready_s": None,      # process start (main import) until warm-up finished
+    "steps": {},          # step name -> {"status", "seconds", "error"?}
+}
+
+_started = None
+_ready = False
+
+
+def mark_imports(started: float):
+    """Record how long main's imports took; started is a time.perf_counter() value."""
+    global _started
+    _started = started
+    STARTUP["import_s"] = round(time.perf_counter() - started, 3)
+
+
+def mark_lifespan(started: float):
+    STARTUP["lifespan_s"] = round(time.perf_counter() - started, 3)
+
+
+async def _step(name: str, fn):
+    t0 = time.perf_counter()
+    entry = {"status": "running"}
+    STARTUP["steps"][name] = entry
+    try:
+        await fn()
+        entry["status"] = "ok"
+    except Exception as e:
+        entry.update(status="failed", error=str(e) or type(e).__name__)
+        log.warning("warm-up step failed", extra={"step": name, "error": entry["error"]})
+    entry["seconds"] = round(time.perf_counter() - t0, 3)
+
+
+async def run(steps: dict):
+    """Run warm-up steps ({name: async fn}) concurrently, then mark the app ready."""
+    global _ready
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(_step(name, fn) for name, fn in steps.items())),
+            timeout=settings.warmup_timeout,
+        )
+    except asyncio.TimeoutError:
+        for entry in STARTUP["steps"].values():
+            if entry["status"] == "running":
+                entry["status"] = "timeout"
+        log.warning("warm-up timed out, serving anyway", extra={"timeout_s": settings.warmup_timeout})
+    _ready = True
+    if _started is not None:
+        STARTUP["ready_s"] = round(time.perf_counter() - _started, 3)
+    log.info("ready", extra={"startup": STARTUP})
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def report() -> dict:
+    return {"ready": _ready, **STARTUP}
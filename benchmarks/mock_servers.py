@@ -0,0 +1,163 @@
+import io
+import os
+import json
+import time
+import random
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# Stand-ins for OpenRouter chat-completions, the HF inference router and Watson NLU/IAM.
+# Behaviour is driven by environment variables so benchmarks/run.py can vary it:
+#
+#   MOCK_<P>_LATENCY_MS   median latency (lognormal)      P = OPENROUTER | HF | WATSON
+#   MOCK_<P>_SIGMA        lognormal sigma (spread / tail)
+#   MOCK_<P>_ERROR_RATE   fraction of 500 responses
+#   MOCK_<P>_429_RATE     fraction of 429 responses
+#   MOCK_HF_COLD_RATE     fraction of 503 "model is loading" responses
+#   MOCK_HF_COLD_SECONDS  estimated_time reported with those 503s
+#   MOCK_STREAM_TOKENS    tokens per streamed chat completion
+
+def _cfg(provider: str) -> dict:
+    defaults = {"OPENROUTER": (800, 0.4), "HF": (4000, 0.5), "WATSON": (300, 0.3)}[provider]
+    return {
+        "latency_ms": float(os.getenv(f"MOCK_{provider}_LATENCY_MS", defaults[0])),
+        "sigma":      float(os.getenv(f"MOCK_{provider}_SIGMA", defaults[1])),
+        "error_rate": float(os.getenv(f"MOCK_{provider}_ERROR_RATE", "0")),
+        "rate_429":   float(os.getenv(f"MOCK_{provider}_429_RATE", "0")),
+    }
+
+
+CFG = {p: _cfg(p) for p in ("OPENROUTER", "HF", "WATSON")}
+HF_COLD_RATE = float(os.getenv("MOCK_HF_COLD_RATE", "0"))
+HF_COLD_SECONDS = float(os.getenv("MOCK_HF_COLD_SECONDS", "2"))
+STREAM_TOKENS = int(os.getenv("MOCK_STREAM_TOKENS", "60"))
+
+app = FastAPI(title="BrandCraft upstream mocks")
+
+
+def _png() -> bytes:
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new("RGB", (512, 512), (30, 90, 200)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+PNG = _png()
+
+
+async def _delay(provider: str):
+    cfg = CFG[provider]
+    await asyncio.sleep(random.lognormvariate(0, cfg["sigma"]) * cfg["latency_ms"] / 1000)
+
+
+def _injected_error(provider: str):
+    cfg = CFG[provider]
+    roll = random.random()
+    if roll < cfg["rate_429"]:
+        return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+    if roll < cfg["rate_429"] + cfg["error_rate"]:
+        return JSONResponse({"error": "mock upstream failure"}, status_code=500)
+    return None
+
+
+# ── OpenRouter ──────────────────────────────────────────────────
+# Schema-valid payload per content type, keyed by a field name only that type's prompt asks for
+_CONTENT = {
+    '"taglines"': ("tagline", {"taglines": [{"text": "Brewed for speed", "use_case": "Homepage"}]}),
+    '"bios"': ("bio", {"bios": {"short": "Fast.", "medium": "Fast and synthetic.", "long": "Fast, synthetic, reliable."}}),
+    '"ads"': ("ad_copy", {"ads": [{"platform": "Facebook", "headline": "Go fast", "body": "Benchmarks love us.", "cta": "Try it"}]}),
+    '"subject"': ("email", {"subject": "Welcome", "preview": "Hi", "body": "Thanks for joining.", "sign_off": "The Mock Team"}),
+    '"posts"': ("social", {"posts": [{"platform": "X", "content": "Launching today", "hashtags": ["#mock"]}]}),
+}
+
+
+def _chat_reply(messages: list) -> str:
+    prompt = messages[-1]["content"] if messages else ""
+    # Repair requests: answer with valid JSON of the required shape, ignoring the broken output
+    prompt = prompt.split("Output to repair:")[0]
+    if '"names"' in prompt:
+        return json.dumps({"names": [
+            {"name": f"Mock{i}", "tagline": "Made for benchmarks", "meaning": "Synthetic.", "style": "Bold"}
+            for i in range(6)
+        ]})
+    if "brand content kit" in prompt:
+        return json.dumps(dict(_CONTENT.values()))
+    for marker, (_, payload) in _CONTENT.items():
+        if marker in prompt:
+            return json.dumps(payload)
+    return "Here is some branding advice from the mock assistant. " * 4
+
+
+@app.post("/openrouter/api/v1/chat/completions")
+async def openrouter_chat(request: Request):
+    body = await request.json()
+    error = _injected_error("OPENROUTER")
+    if error is not None:
+        await _delay("OPENROUTER")
+        return error
+    reply = _chat_reply(body.get("messages", []))
+
+    if not body.get("stream"):
+        await _delay("OPENROUTER")
+        return {"choices": [{"message": {"role": "assistant", "content": reply}}]}
+
+    async def frames():
+        await _delay("OPENROUTER")  # time to first token
+        size = max(1, -(-len(reply) // max(STREAM_TOKENS, 1)))
+        per_token = CFG["OPENROUTER"]["latency_ms"] / 1000 / max(STREAM_TOKENS, 1)
+        for i in range(0, len(reply), size):
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': reply[i:i + size]}}]})}\n\n"
+            await asyncio.sleep(per_token)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(frames(), media_type="text/event-stream")
+
+
+# ── HuggingFace inference router ────────────────────────────────
+@app.post("/hf/models/{model:path}")
+async def hf_inference(model: str):
+    if random.random() < HF_COLD_RATE:
+        await asyncio.sleep(0.05)
+        return JSONResponse({"error": f"Model {model} is currently loading", "estimated_time": HF_COLD_SECONDS},
+                            status_code=503)
+    error = _injected_error("HF")
+    await _delay("HF")
+    if error is not None:
+        return error
+    return Response(PNG, media_type="image/png")
+
+
+# ── IBM IAM + Watson NLU ────────────────────────────────────────
+@app.post("/iam/identity/token")
+async def iam_token():
+    import jwt
+    now = int(time.time())
+    token = jwt.encode({"iat": now, "exp": now + 3600}, "benchmark-mock-signing-secret-0123456789", algorithm="HS256")
+    return {"access_token": token, "refresh_token": "mock", "token_type": "Bearer",
+            "expires_in": 3600, "expiration": now + 3600}
+
+
+@app.get("/watson/v1/models")
+async def watson_models():
+    return {"models": []}
+
+
+@app.post("/watson/v1/analyze")
+async def watson_analyze():
+    error = _injected_error("WATSON")
+    await _delay("WATSON")
+    if error is not None:
+        return error
+    return {
+        "sentiment": {"document": {"label": "positive", "score": 0.82}},
+        "emotion": {"document": {"emotion": {
+            "joy": 0.71, "sadness": 0.08, "anger": 0.02, "fear": 0.05, "disgust": 0.01,
+        }}},
+        "keywords": [{"text": "mock keyword", "relevance": 0.9}],
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
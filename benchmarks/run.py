@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import httpx
+
+# Offline load test: starts the upstream mocks and the BrandCraft app as separate
+# uvicorn processes, points the app at the mocks via env vars, then drives the
+# /api/* routes at a fixed concurrency.
+#
+#   python -m benchmarks.run --concurrency 50 --duration 20
+#   python -m benchmarks.run --routes sentiment_local,brand_name --mock-openrouter-ms 1500
+#
+# "Loop lag" is measured from the outside: a probe hits /health every 50 ms while the
+# load runs. /health does no work, so any latency it shows is time the server's event
+# loop spent blocked or saturated — the symptom of blocking calls inside async routes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JOB_POLL_INTERVAL = 0.25
+JOB_POLL_TIMEOUT = 120
+
+
+async def poll_job(client: httpx.AsyncClient, r: httpx.Response) -> httpx.Response:
+    """Follow a submitted logo job until it finishes, so latency covers the whole job."""
+    if r.status_code != 202:
+        return r
+    deadline = time.perf_counter() + JOB_POLL_TIMEOUT
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        r = await client.get(f"/api/logo/jobs/{r.json()['job_id']}")
+        if r.status_code != 200 or r.json()["status"] in ("done", "failed"):
+            return r
+    raise httpx.TimeoutException("logo job did not finish")
+
+
+async def image_path(client: httpx.AsyncClient) -> str:
+    """Generate one logo up front; the image route then re-reads it from the store."""
+    r = await client.post("/api/logo", json={"brand_name": f"Bloom{random.randint(0, 10**6)}"})
+    url = r.json().get("image_url")
+    if not url:
+        raise RuntimeError(f"could not create a logo to fetch: {r.text[:200]}")
+    return url
+
+
+def batch(n: int, item):
+    return lambda: {"items": [item() for _ in range(n)]}
+
+
+# name -> (method, path, body, follow-up). A callable path is resolved once before the run.
+ROUTES = {
+    "brand_name": ("POST", "/api/brand-name",
+                   lambda: {"niche": f"coffee shop {random.randint(0, 10**6)}", "use_cache": False}),
+    "brand_name_stream": ("POST", "/api/brand-name/stream",
+                          lambda: {"niche": f"coffee shop {random.randint(0, 10**6)}", "use_cache": False}),
+    "content": ("POST", "/api/content",
+                lambda: {"brand_name": "Bloom", "niche": "coffee", "content_type": "tagline", "use_cache": False}),
+    "content_kit": ("POST", "/api/content",
+                    lambda: {"brand_name": "Bloom", "niche": "coffee", "content_type": "kit", "use_cache": False}),
+    "logo": ("POST", "/api/logo",
+             lambda: {"brand_name": f"Bloom{random.randint(0, 10**6)}"}),
+    "logo_jobs": ("POST", "/api/logo/jobs",
+                  lambda: {"brand_name": f"Bloom{random.randint(0, 10**6)}"}, poll_job),
+    "image": ("GET", image_path, None),
+    "sentiment_local": ("POST", "/api/sentiment",
+                        lambda: {"text": "We love making beautiful, sustainable products for everyone.",
+                                 "backend": "local", "use_cache": False}),
+    "sentiment_watson": ("POST", "/api/sentiment",
+                         lambda: {"text": "We love making beautiful, sustainable products for everyone. " * 3,
+                                  "backend": "watson", "use_cache": False}),
+    "batch_brand_name": ("POST", "/api/batch/brand-name",
+                         batch(5, lambda: {"niche": f"coffee shop {random.randint(0, 10**6)}", "use_cache": False})),
+    "batch_content": ("POST", "/api/batch/content",
+                      batch(5, lambda: {"brand_name": f"Bloom{random.randint(0, 10**6)}", "niche": "coffee",
+                                        "content_type": "tagline", "use_cache": False})),
+    "batch_sentiment_local": ("POST", "/api/batch/sentiment",
+                              batch(20, lambda: {"text": "We love making beautiful, sustainable products.",
+                                                 "backend": "local", "use_cache": False})),
+    "assistant": ("POST", "/api/assistant",
+                  lambda: {"message": "How should I position a coffee brand?"}),
+    "assistant_stream": ("POST", "/api/assistant/stream",
+                         lambda: {"message": "How should I position a coffee brand?"}),
+}
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def start_server(module: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ, **env},
+        stdout=subprocess.DEVNULL if not env.get("BENCH_VERBOSE") else None,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.time() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+async def drive(base: str, route: str, concurrency: int, duration: float) -> dict:
+    method, path, body, *follow = ROUTES[route]
+    latencies, statuses = [], {}
+    lag = []
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency + 5)
+
+    async with httpx.AsyncClient(base_url=base, timeout=300, limits=limits) as client:
+        if callable(path):
+            path = await path(client)
+
+        async def worker():
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    if path.endswith("/stream"):
+                        async with client.stream(method, path, json=body()) as r:
+                            async for _ in r.aiter_bytes():
+                                pass
+                    else:
+                        r = await client.request(method, path, json=body() if body else None)
+                        for step in follow:
+                            r = await step(client, r)
+                    key = str(r.status_code)
+                    if r.status_code == 200 and follow and r.json().get("status") == "failed":
+                        key = "job_failed"
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[key] = statuses.get(key, 0) + 1
+
+        async def probe():
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    await client.get("/health")
+                    lag.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.05)
+
+        began = time.perf_counter()
+        await asyncio.gather(probe(), *(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - began
+
+    return {
+        "route": route,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "statuses": statuses,
+        "loop_lag_p50_ms": round(percentile(lag, 50) * 1000, 1),
+        "loop_lag_p99_ms": round(percentile(lag, 99) * 1000, 1),
+        "loop_lag_max_ms": round(max(lag, default=0) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline BrandCraft load test against local upstream mocks")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated: " + ", ".join(ROUTES))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per route")
+    parser.add_argument("--app-port", type=int, default=8701)
+    parser.add_argument("--mock-port", type=int, default=8702)
+    parser.add_argument("--mock-openrouter-ms", type=float, default=800)
+    parser.add_argument("--mock-hf-ms", type=float, default=4000)
+    parser.add_argument("--mock-watson-ms", type=float, default=300)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-hf-cold-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per route")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="keep admission control on (all load comes from one client, so most of it is shed)")
+    args = parser.parse_args()
+
+    mock = f"http://127.0.0.1:{args.mock_port}"
+    mock_env = {
+        "MOCK_OPENROUTER_LATENCY_MS": str(args.mock_openrouter_ms),
+        "MOCK_HF_LATENCY_MS": str(args.mock_hf_ms),
+        "MOCK_WATSON_LATENCY_MS": str(args.mock_watson_ms),
+        "MOCK_OPENROUTER_ERROR_RATE": str(args.mock_error_rate),
+        "MOCK_HF_ERROR_RATE": str(args.mock_error_rate),
+        "MOCK_WATSON_ERROR_RATE": str(args.mock_error_rate),
+        "MOCK_HF_COLD_RATE": str(args.mock_hf_cold_rate),
+    }
+    app_env = {
+        "OPENROUTER_API_KEY": "bench", "OPENROUTER_URL": f"{mock}/openrouter/api/v1/chat/completions",
+        "HF_TOKEN": "bench", "HF_API_BASE": f"{mock}/hf/models",
+        "IBM_API_KEY": "bench", "IBM_URL": f"{mock}/watson", "IBM_IAM_URL": f"{mock}/iam",
+        "LOGO_POSTPROCESS": "0", "LOG_LEVEL": "WARNING",
+        "RATE_LIMIT_ENABLED": "1" if args.rate_limit else "0",
+    }
+    # Fresh shared state per run, outside the repo's .state/
+    state_dir = tempfile.TemporaryDirectory(prefix="brandcraft-bench-")
+    app_env["STATE_DB"] = os.path.join(state_dir.name, "state.db")
+
+    procs = [start_server("benchmarks.mock_servers:app", args.mock_port, mock_env),
+             start_server("backend.main:app", args.app_port, app_env)]
+    try:
+        asyncio.run(wait_ready(f"{mock}/health"))
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.app_port}/health"))
+        for route in [r.strip() for r in args.routes.split(",") if r.strip()]:
+            result = asyncio.run(drive(f"http://127.0.0.1:{args.app_port}", route, args.concurrency, args.duration))
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{route:18} {result['requests']:6d} req  {result['throughput_rps']:8.1f} rps  "
+                      f"p50 {result['p50_ms']:8.1f}  p95 {result['p95_ms']:8.1f}  p99 {result['p99_ms']:8.1f} ms  "
+                      f"loop-lag p99 {result['loop_lag_p99_ms']:6.1f} max {result['loop_lag_max_ms']:6.1f} ms  "
+                      f"{result['statuses']}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+        state_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()